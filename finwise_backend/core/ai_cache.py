@@ -0,0 +1,248 @@
+import json
+import math
+import re
+import hashlib
+import time
+import logging
+import inspect
+import dataclasses
+import functools
+import operator
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Optional, Any, Sequence, Tuple
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+def profile_cache_key(user_profile: Any) -> str:
+    """Canonical string form of a user profile, given as a dict or a dataclass"""
+    if dataclasses.is_dataclass(user_profile):
+        user_profile = dataclasses.asdict(user_profile)
+    return json.dumps(user_profile, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def profile_fingerprint(user_profile: Any) -> int:
+    """64-bit fingerprint of a user profile, used to bucket cached responses and tag logs"""
+    digest = hashlib.blake2b(profile_cache_key(user_profile).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def message_cache_key(user_message: str) -> str:
+    """Case- and whitespace-insensitive form of a question, for exact-match caching"""
+    return _WHITESPACE_RE.sub(' ', user_message.strip().lower())
+
+
+def _shared_key(namespace: str, profile_key: int) -> str:
+    """Django cache key for an exact-match entry; the namespace may hold free text"""
+    digest = hashlib.blake2b(namespace.encode(), digest_size=8).hexdigest()
+    return f"ai:{digest}:{profile_key:016x}"
+
+
+def _normalize(vector: Sequence[float]) -> array:
+    """Unit vector packed as 32-bit floats, ~3 KB for a 768-dim embedding"""
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return array('f', (x / norm for x in vector))
+
+
+class SemanticCache:
+    """Cache of AI responses matched on prompt embedding similarity.
+
+    Responses are bucketed by (namespace, profile fingerprint) so a tax answer never
+    serves a chat request and one user's numbers never leak into another's.
+    Inside a bucket, a question whose embedding has cosine similarity above
+    `threshold` with a cached question is treated as the same question.
+    Exact-match entries (no vector) live in Django's cache instead, so
+    every worker shares them when CACHES points at Redis.
+    """
+
+    def __init__(self, threshold: float = 0.92, ttl: int = 1800,
+                 max_entries: int = 4096, max_entries_per_bucket: int = 32):
+        self.threshold = threshold
+        self.ttl = ttl
+        # Total entries across all buckets; least recently used buckets go first
+        self.max_entries = max_entries
+        self.max_entries_per_bucket = max_entries_per_bucket
+        # (namespace, profile fingerprint) -> [(unit vector, response, stored_at)]
+        self._buckets = OrderedDict()
+        self._entry_count = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, namespace: str, profile_key: int, vector: Optional[Sequence[float]] = None) -> Optional[Any]:
+        """Return the cached response closest to `vector`, or None on a miss.
+
+        Without a vector (no free-text question) the bucket is an exact match.
+        """
+        if vector is None:
+            try:
+                return cache.get(_shared_key(namespace, profile_key))
+            except Exception as e:
+                logger.warning(f"Shared {namespace} cache lookup failed: {e}")
+                return None
+
+        key = (namespace, profile_key)
+        query = _normalize(vector)
+        now = time.monotonic()
+
+        with self._lock:
+            entries = self._buckets.get(key)
+            if not entries:
+                return None
+            live = [e for e in entries if now - e[2] < self.ttl]
+            self._entry_count -= len(entries) - len(live)
+            entries[:] = live
+            self._buckets.move_to_end(key)
+
+            best_response, best_score = None, self.threshold
+            for cached_vector, response, _ in entries:
+                score = sum(map(operator.mul, query, cached_vector))
+                if score >= best_score:
+                    best_response, best_score = response, score
+            return best_response
+
+    def store(self, namespace: str, profile_key: int, vector: Optional[Sequence[float]], response: Any) -> None:
+        """Insert a response into the cache"""
+        if vector is None:
+            try:
+                cache.set(_shared_key(namespace, profile_key), response, self.ttl)
+            except Exception as e:
+                logger.warning(f"Shared {namespace} cache store failed: {e}")
+            return
+
+        key = (namespace, profile_key)
+        entry = (_normalize(vector), response, time.monotonic())
+
+        with self._lock:
+            entries = self._buckets.setdefault(key, [])
+            entries.append(entry)
+            self._entry_count += 1
+            if len(entries) > self.max_entries_per_bucket:
+                self._entry_count -= len(entries) - self.max_entries_per_bucket
+                del entries[:-self.max_entries_per_bucket]
+            self._buckets.move_to_end(key)
+            while self._entry_count > self.max_entries:
+                _, evicted = self._buckets.popitem(last=False)
+                self._entry_count -= len(evicted)
+
+
+# Global instance
+semantic_cache = SemanticCache()
+
+
+class UncachedResponse(Exception):
+    """Raised by a semantic_cached method to return `response` without caching it,
+    e.g. a fallback built because Gemini's answer was empty"""
+
+    def __init__(self, response: Any):
+        super().__init__("Response is not cacheable")
+        self.response = response
+
+
+def _call_key(args: tuple, profile_key: Optional[int]) -> Tuple[Optional[str], int]:
+    """(user message or None, profile fingerprint) of a semantic_cached call"""
+    user_message = args[0] if len(args) > 1 else None
+    if profile_key is None:
+        profile_key = profile_fingerprint(args[-1])
+    return user_message, profile_key
+
+
+def _exact_bucket(namespace: str, user_message: Optional[str]) -> str:
+    """Exact-match bucket for a call: the normalized question, if there is one"""
+    return f"{namespace}:{message_cache_key(user_message)}" if user_message else namespace
+
+
+def _lookup(namespace: str, bucket: str, profile_key: int, vector: Optional[Sequence[float]] = None) -> Optional[Any]:
+    cached = semantic_cache.lookup(bucket, profile_key, vector)
+    if cached is not None:
+        logger.info(f"Serving {namespace} response from semantic cache")
+    return cached
+
+
+def _lookup_similar(namespace: str, bucket: str, profile_key: int, vector: Sequence[float]) -> Optional[Any]:
+    """Closest cached answer to a similar question, remembered under this exact one too"""
+    cached = _lookup(namespace, namespace, profile_key, vector)
+    if cached is not None:
+        semantic_cache.store(bucket, profile_key, None, cached)
+    return cached
+
+
+def _store(namespace: str, bucket: str, profile_key: int, vector: Optional[Sequence[float]], response: Any) -> None:
+    semantic_cache.store(bucket, profile_key, None, response)
+    if vector is not None:
+        semantic_cache.store(namespace, profile_key, vector, response)
+
+
+def semantic_cached(namespace: str):
+    """Cache a GeminiAIService method in `semantic_cache` under `namespace`.
+
+    The wrapped method takes `(user_message, profile)` or `(profile,)`.
+    A repeat of the same question (ignoring case and whitespace) is served
+    straight from an exact-match entry. Otherwise the message is embedded
+    with the service's `_embed` (`_aembed` for coroutine methods) and matched
+    against similar cached questions; if embedding fails only the exact-match
+    entry is used. Sync and async methods share one cache. A method that
+    raises UncachedResponse returns its response without it being stored.
+    Callers that already hold the profile's fingerprint pass it as
+    `profile_key` so it is not recomputed.
+    """
+    def decorator(method):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, profile_key: Optional[int] = None):
+                user_message, profile_key = _call_key(args, profile_key)
+                bucket = _exact_bucket(namespace, user_message)
+                cached = _lookup(namespace, bucket, profile_key)
+                if cached is not None:
+                    return cached
+
+                vector = None
+                if user_message:
+                    try:
+                        vector = await self._aembed(user_message)
+                    except Exception as e:
+                        logger.warning(f"Matching {namespace} response cache on exact message only: {e}")
+                    else:
+                        cached = _lookup_similar(namespace, bucket, profile_key, vector)
+                        if cached is not None:
+                            return cached
+
+                try:
+                    response = await method(self, *args)
+                except UncachedResponse as e:
+                    return e.response
+                _store(namespace, bucket, profile_key, vector, response)
+                return response
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, profile_key: Optional[int] = None):
+            user_message, profile_key = _call_key(args, profile_key)
+            bucket = _exact_bucket(namespace, user_message)
+            cached = _lookup(namespace, bucket, profile_key)
+            if cached is not None:
+                return cached
+
+            vector = None
+            if user_message:
+                try:
+                    vector = self._embed(user_message)
+                except Exception as e:
+                    logger.warning(f"Matching {namespace} response cache on exact message only: {e}")
+                else:
+                    cached = _lookup_similar(namespace, bucket, profile_key, vector)
+                    if cached is not None:
+                        return cached
+
+            try:
+                response = method(self, *args)
+            except UncachedResponse as e:
+                return e.response
+            _store(namespace, bucket, profile_key, vector, response)
+            return response
+        return wrapper
+    return decorator
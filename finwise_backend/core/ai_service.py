@@ -1,27 +1,808 @@
 import os
+import io
+import time
 import json
-import google.generativeai as genai
-from typing import Dict, List, Optional, Any
+import orjson
+import atexit
+import asyncio
+import contextvars
+import functools
+import threading
+import httpx
+from dataclasses import dataclass, fields
+from tenacity import (
+    AsyncRetrying, Retrying, before_sleep_log, retry_if_exception,
+    stop_after_attempt, stop_after_delay, stop_any, wait_exponential_jitter
+)
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 import logging
 import re
+from .ai_cache import semantic_cached, profile_fingerprint, UncachedResponse
 
 logger = logging.getLogger(__name__)
 
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+GEMINI_MODEL = "gemini-1.5-flash"
+EMBEDDING_MODEL = "text-embedding-004"
+# Concurrent Gemini calls allowed per worker, for each of the sync and async paths
+GEMINI_MAX_CONCURRENCY = 20
+# Time limits, in seconds, kept under the 30 s nginx/gunicorn request timeout
+# so a hung Gemini call still leaves time to serve the fallback: each generate
+# attempt (generateContent sends nothing until the whole answer is ready, so
+# the read timeout bounds generation time), each embedding lookup, and the
+# window in which retries may start. Worst case: an embedding lookup, then a
+# last attempt starting just before the deadline, about 3 + 8 + 3 + 12 = 26 s
+GEMINI_TIMEOUT = httpx.Timeout(12, connect=3)
+GEMINI_EMBED_TIMEOUT = httpx.Timeout(3, connect=2)
+GEMINI_RETRY_DEADLINE = 8
+# Seconds a profile is left alone after its prefetch failed, so an outage
+# doesn't turn every chat message into more doomed Gemini calls
+PREFETCH_FAILURE_COOLDOWN = 60
+
+# Chat response sections, in the order CHAT_SYSTEM_INSTRUCTION asks for them
+_SECTION_KEYS = {
+    'Main Advice': 'main_advice',
+    'Specific Numbers': 'specific_numbers',
+    'Action Steps': 'action_steps',
+    'Timeline': 'timeline',
+    'Risks & Considerations': 'risks'
+}
+_SECTION_RE = re.compile(r'\*\*(' + '|'.join(map(re.escape, _SECTION_KEYS)) + r'):\*\*')
+# (key, heading) pairs the parsed sections are reassembled under
+_SECTION_HEADINGS = tuple((key, f"**{label}:**\n") for label, key in _SECTION_KEYS.items())
+# Stand-in text for a section header the model left empty
+_SECTION_DEFAULTS = {
+    'main_advice': "Based on your financial profile, I recommend focusing on building a strong financial foundation through systematic savings and smart investments.",
+    'specific_numbers': "Consider setting aside 20-30% of your monthly income for savings and investments. Emergency fund target: 6 months of expenses.",
+    'action_steps': "1. Review your current expenses and identify areas to cut back. 2. Set up automatic savings transfers. 3. Research investment options suitable for your risk profile. 4. Consult with a financial advisor for personalized guidance.",
+    'timeline': "Start implementing these steps immediately. Review progress monthly and adjust strategies quarterly. Set quarterly milestones to track your financial goals.",
+    'risks': "1. Market volatility can affect investment returns. 2. Inflation may reduce purchasing power over time. 3. Ensure adequate insurance coverage for unexpected events."
+}
+
+# Chat response clean-up
+_BLANK_LINES_RE = re.compile(r'\n{2,}')
+_LAST_SENTENCE_RE = re.compile(r'^(.*[.!?])[^.!?]*$', re.DOTALL)
+
+# Static instructions sent as Gemini's systemInstruction; each request's
+# contents carry only the user's profile (and question) as compact JSON
+_CHAT_ROLE = """You are an expert financial advisor with 20+ years of experience in Indian financial markets. The user message is JSON with their "profile" (amounts in ₹, income is annual) and their "question"."""
+
+_CHAT_CONTEXT = """Use Indian context: tax deductions (80C, 80D, 80CCD), products (ELSS, PPF, NPS, mutual funds), government schemes (PM-KISAN, Ayushman Bharat), banking, insurance, real estate and gold."""
+
+# Streamed chat keeps the markdown sections so text can be shown as it arrives
+CHAT_SYSTEM_INSTRUCTION = _CHAT_ROLE + """
+
+Answer in this EXACT format, filling every section:
+
+**Main Advice:** 2-3 complete sentences with your primary recommendation and why it matters for their situation.
+
+**Specific Numbers:** At least 2-3 exact amounts, percentages or calculations in ₹ based on their profile (expected returns for investments, target amounts for savings).
+
+**Action Steps:** 3-4 specific steps they can take immediately, numbered 1, 2, 3, 4.
+
+**Timeline:** Short-term (1-3 months), medium-term (3-12 months) and long-term (1+ years) actions where applicable.
+
+**Risks & Considerations:** 2-3 important risks or limitations and how to mitigate them.
+
+""" + _CHAT_CONTEXT + """
+
+Example for a ₹12,00,000 income with ₹1,00,000 saved (use the user's own numbers):
+**Main Advice:** Prioritize an emergency fund covering 6 months of expenses. It provides security and prevents debt during unexpected situations.
+
+**Specific Numbers:** Target emergency fund: ₹6,00,000. Current gap: ₹5,00,000. Monthly contribution needed: ₹41,667.
+
+**Action Steps:** 1. Open a high-yield savings account at 4-6% interest. 2. Automate monthly transfers of ₹41,667. 3. Cut non-essential expenses by 15-20%. 4. Consider liquid mutual funds for better returns.
+
+**Timeline:** Start immediately. Reach the 3-month target in 6 months and the 6-month target in 12-18 months. Review contributions quarterly.
+
+**Risks & Considerations:** 1. Don't keep emergency funds in volatile assets. 2. Ensure liquidity within 24-48 hours. 3. Account for inflation over time."""
+
+# Non-streamed chat asks for the same sections as JSON (see _CHAT_RESPONSE_SCHEMA)
+CHAT_JSON_SYSTEM_INSTRUCTION = _CHAT_ROLE + """
+
+Reply with one object, filling every field: "main_advice" is 2-3 complete sentences with your primary recommendation and why it matters for their situation, "specific_numbers" at least 2-3 exact amounts, percentages or calculations in ₹ based on their profile (expected returns for investments, target amounts for savings), "action_steps" 3-4 specific steps they can take immediately, numbered 1, 2, 3, 4, "timeline" short-term (1-3 months), medium-term (3-12 months) and long-term (1+ years) actions where applicable, and "risks" 2-3 important risks or limitations and how to mitigate them, each using the user's own numbers.
+
+""" + _CHAT_CONTEXT
+
+TAX_SYSTEM_INSTRUCTION = """You are a tax expert in Indian tax law. The user message is JSON with their "profile" (amounts in ₹, income is annual) and their "tax_bracket". Give 5-7 specific tax-saving recommendations, calculating savings from their tax bracket, with exact amounts in ₹.
+
+Reply with one object per strategy: "title" is the strategy name, "description" the step-by-step implementation including the amount to invest, "potential_saving" the tax saved in ₹ at their bracket, "priority" how much it matters for them ("high", "medium" or "low"), "category" the section it falls under (e.g. "Section 80C"), "action" the first thing to do, "risk" the investment risk ("Low", "Medium" or "High"), "returns" the expected returns and "lock_in" the lock-in period.
+
+Consider: ELSS (80C, ₹1.5 lakh limit), PPF (₹1.5 lakh limit), NPS (₹2 lakh limit), health insurance (80D, ₹25,000 limit), home loan interest (₹2 lakh limit), education loan interest (80E, no limit), HRA exemptions, the ₹50,000 standard deduction and professional tax."""
+
+BENEFITS_SYSTEM_INSTRUCTION = """You are an expert in Indian government benefit schemes. The user message is JSON with their "profile" (amounts in ₹, income is annual). Recommend 5-7 programs they likely qualify for, with exact amounts and application steps.
+
+Reply with one object per program: "name" is the program name, "description" covers the application steps and required documents, "eligibility_reason" why the user qualifies, "amount" the benefit amount in ₹, "category" the kind of benefit (Health, Insurance, Savings, etc.) and "estimatedTime" the approval and disbursement timeline.
+
+Consider: PM-KISAN (₹6,000/year for farmers), Ayushman Bharat (₹5 lakh health cover), PMAY housing subsidy, Mudra loans, PMJJBY (₹2 lakh life cover for ₹330/year), PMSBY (₹2 lakh accident cover for ₹12/year), Atal Pension Yojana, Sukanya Samriddhi Yojana, PM Fasal Bima Yojana, PM Ujjwala Yojana, PM Garib Kalyan Yojana, and schemes specific to the user's state."""
+
+# Gemini doesn't reliably know scheme URLs, so every generated benefit links here
+BENEFITS_PORTAL = "https://www.india.gov.in/topics/benefits"
+
+# Gemini responseSchema for each structured reply, so chat, tax and benefits
+# come back as JSON already in the shape the API returns
+_CHAT_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {key: {"type": "STRING"} for key in _SECTION_KEYS.values()},
+    "required": list(_SECTION_KEYS.values()),
+    "propertyOrdering": list(_SECTION_KEYS.values())
+}
+
+_TAX_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "title": {"type": "STRING"},
+            "description": {"type": "STRING"},
+            "potential_saving": {"type": "INTEGER"},
+            "priority": {"type": "STRING", "enum": ["high", "medium", "low"]},
+            "category": {"type": "STRING"},
+            "action": {"type": "STRING"},
+            "risk": {"type": "STRING", "enum": ["Low", "Medium", "High"]},
+            "returns": {"type": "STRING"},
+            "lock_in": {"type": "STRING"}
+        },
+        "required": ["title", "description", "potential_saving", "priority", "category", "action", "risk", "returns", "lock_in"],
+        "propertyOrdering": ["title", "description", "potential_saving", "priority", "category", "action", "risk", "returns", "lock_in"]
+    }
+}
+
+_BENEFITS_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "name": {"type": "STRING"},
+            "description": {"type": "STRING"},
+            "eligibility_reason": {"type": "STRING"},
+            "amount": {"type": "STRING"},
+            "category": {"type": "STRING"},
+            "estimatedTime": {"type": "STRING"}
+        },
+        "required": ["name", "description", "eligibility_reason", "amount", "category", "estimatedTime"],
+        "propertyOrdering": ["name", "description", "eligibility_reason", "amount", "category", "estimatedTime"]
+    }
+}
+
+# Follow-up suggestions by topic, returned as-is (shared, so kept immutable)
+_SUGGESTIONS = {
+    'investment': (
+        "What's the best investment strategy for my age?",
+        "How much should I invest monthly?",
+        "What are the risks of this investment?",
+        "Show me low-risk investment options",
+        "Which tax-saving investments are best for me?",
+        "How do I diversify my portfolio?"
+    ),
+    'saving': (
+        "How much should I save each month?",
+        "What's the best way to budget my income?",
+        "How do I build an emergency fund?",
+        "What are good savings goals?",
+        "How can I automate my savings?",
+        "What's the 50/30/20 rule?"
+    ),
+    'tax': (
+        "What tax deductions can I claim?",
+        "How can I reduce my tax bill?",
+        "What are the best tax-saving investments?",
+        "When should I file my taxes?",
+        "How much can I save with 80C deductions?",
+        "What's the difference between 80C and 80CCD?"
+    ),
+    'debt': (
+        "How do I pay off debt faster?",
+        "What's the best debt payoff strategy?",
+        "Should I consolidate my loans?",
+        "How much debt is too much?",
+        "What's the debt avalanche method?",
+        "How do I prioritize debt payments?"
+    ),
+    'retirement': (
+        "How much should I save for retirement?",
+        "What's the best retirement account?",
+        "When should I start retirement planning?",
+        "How do I calculate retirement needs?",
+        "What's the difference between EPF and NPS?",
+        "How do I maximize retirement savings?"
+    ),
+    'emergency': (
+        "How much should I have in emergency fund?",
+        "Where should I keep my emergency fund?",
+        "How do I build an emergency fund quickly?",
+        "What counts as an emergency expense?",
+        "Should I invest my emergency fund?",
+        "How often should I review my emergency fund?"
+    ),
+    'insurance': (
+        "How much life insurance do I need?",
+        "What's the best health insurance plan?",
+        "Should I get term or whole life insurance?",
+        "How do I choose the right insurance?",
+        "What are government insurance schemes?",
+        "How much should I pay for insurance?"
+    ),
+    'default': (
+        "Tell me more about this",
+        "How can I implement this?",
+        "What are the risks?",
+        "Show me alternatives",
+        "Give me specific numbers",
+        "What's the next step?"
+    )
+}
+
+# Keyword -> topic; topics win in _SUGGESTION_TOPIC_ORDER when several match
+_SUGGESTION_KEYWORDS = {
+    'investment': 'investment',
+    'saving': 'saving',
+    'budget': 'saving',
+    'tax': 'tax',
+    'debt': 'debt',
+    'loan': 'debt',
+    'retirement': 'retirement',
+    'emergency': 'emergency',
+    'fund': 'emergency',
+    'insurance': 'insurance'
+}
+_SUGGESTION_TOPIC_ORDER = ('investment', 'saving', 'tax', 'debt', 'retirement', 'emergency', 'insurance')
+
+# Keyword -> fallback chat template topic, with the same precedence rule
+_FALLBACK_TOPIC_KEYWORDS = {
+    'tax': 'tax',
+    'itr': 'tax',
+    'deduction': 'tax',
+    'invest': 'investment',
+    'mutual fund': 'investment',
+    'stock': 'investment',
+    'save': 'saving',
+    'saving': 'saving',
+    'emergency': 'saving',
+    'fund': 'saving'
+}
+_FALLBACK_TOPIC_ORDER = ('tax', 'investment', 'saving')
+
+def _iter_sections(text: str) -> Iterator[Tuple[str, int, int]]:
+    """Yield (section key, body start, body end) for each section header in text"""
+    headers = list(_SECTION_RE.finditer(text))
+    for i, header in enumerate(headers):
+        body_end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        yield _SECTION_KEYS[header.group(1)], header.end(), body_end
+
+def _format_sections(sections: Dict[str, str]) -> str:
+    """Reassemble parsed sections under their headings, in the canonical order"""
+    return "\n\n".join(
+        heading + sections[key] for key, heading in _SECTION_HEADINGS if key in sections
+    )
+
+def _keyword_topics(keyword: str) -> Tuple[frozenset, frozenset]:
+    """(fallback topics, suggestion topics) a matched keyword stands for.
+
+    A keyword also counts for every shorter keyword it starts with ("investment"
+    for "invest"), because the combined pattern reports only the longest keyword
+    at each word start.
+    """
+    def topics(keywords: Dict[str, str]) -> frozenset:
+        return frozenset(topic for prefix, topic in keywords.items() if keyword.startswith(prefix))
+    return topics(_FALLBACK_TOPIC_KEYWORDS), topics(_SUGGESTION_KEYWORDS)
+
+_KEYWORD_TOPICS = {
+    keyword: _keyword_topics(keyword)
+    for keyword in {**_SUGGESTION_KEYWORDS, **_FALLBACK_TOPIC_KEYWORDS}
+}
+
+# One-pass matcher for keywords at the start of a word ("fund" but not "refund").
+# The match is a lookahead so keywords that overlap are all found. It runs on
+# the lowercased message, so every match is a key of _KEYWORD_TOPICS as-is
+# (re.IGNORECASE would also match e.g. "ſave", which lowercases to no keyword).
+_TOPIC_RE = re.compile(
+    r'\b(?=(' + '|'.join(map(re.escape, sorted(_KEYWORD_TOPICS, key=len, reverse=True))) + '))'
+)
+
+def _find_topics(message: str) -> Tuple[Optional[str], Optional[str]]:
+    """Highest-precedence (fallback topic, suggestion topic) in `message`, from a single scan"""
+    fallback_topics, suggestion_topics = set(), set()
+    for keyword in _TOPIC_RE.findall(message.lower()):
+        fallback, suggestion = _KEYWORD_TOPICS[keyword]
+        fallback_topics |= fallback
+        suggestion_topics |= suggestion
+    return (
+        next((topic for topic in _FALLBACK_TOPIC_ORDER if topic in fallback_topics), None),
+        next((topic for topic in _SUGGESTION_TOPIC_ORDER if topic in suggestion_topics), None)
+    )
+
+@functools.lru_cache(maxsize=1024)
+def _rs(amount: float) -> str:
+    """Digit-grouped rupee amount; profile numbers repeat across requests"""
+    return f"{amount:,}"
+
+def _compact_json(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+@functools.lru_cache(maxsize=4096)
+def _profile_json(profile: Tuple[Tuple[str, Any], ...]) -> str:
+    """Serialize a prompt's (field, value) profile pairs; the same profiles recur across requests"""
+    return _compact_json(dict(profile))
+
+def _request_body(prompt: str, system_instruction: str, response_schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build a generateContent request body, asking for JSON matching `response_schema` if given"""
+    body = {
+        "systemInstruction": {"parts": [{"text": system_instruction}]},
+        "contents": [{"role": "user", "parts": [{"text": prompt}]}]
+    }
+    if response_schema is not None:
+        body["generationConfig"] = {
+            "responseMimeType": "application/json",
+            "responseSchema": response_schema
+        }
+    return body
+
+def _is_transient(exc: BaseException) -> bool:
+    """Whether a failed Gemini call is worth retrying (network errors, 429 and 5xx).
+
+    A read timeout isn't: the generation was just slow, and asking again
+    would only wait as long a second time.
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(exc, httpx.TransportError) and not isinstance(exc, httpx.ReadTimeout)
+
+# Up to three attempts with jittered exponential backoff, and no new attempt
+# once GEMINI_RETRY_DEADLINE has passed; the last error is re-raised so the
+# public generate_* methods can still fall back
+_RETRY_OPTIONS = {
+    'retry': retry_if_exception(_is_transient),
+    'stop': stop_any(stop_after_attempt(3), stop_after_delay(GEMINI_RETRY_DEADLINE)),
+    'wait': wait_exponential_jitter(initial=0.5, max=4),
+    'before_sleep': before_sleep_log(logger, logging.WARNING),
+    'reraise': True
+}
+
+# Prefetches are only a cache warm-up: a single attempt, no retries
+_PREFETCH_RETRY_OPTIONS = {**_RETRY_OPTIONS, 'stop': stop_after_attempt(1)}
+
+# Set inside prefetch tasks so _agenerate_content uses _PREFETCH_RETRY_OPTIONS
+_in_prefetch = contextvars.ContextVar('in_prefetch', default=False)
+
+def _response_text(data: Dict[str, Any]) -> str:
+    """Extract the generated text from a generateContent response body"""
+    candidates = data.get('candidates') or []
+    if not candidates:
+        raise ValueError(f"Gemini returned no candidates: {data.get('promptFeedback')}")
+    parts = candidates[0].get('content', {}).get('parts', [])
+    return "".join(part.get('text', '') for part in parts)
+
+def _object_list(data: Any, what: str) -> List[Dict[str, Any]]:
+    """Check a decoded reply is the JSON array of objects its schema asks for"""
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        raise ValueError(f"{what} reply is not a JSON array of objects")
+    return data
+
+def _generated_text(data: Dict[str, Any]) -> str:
+    """Extract the text of a complete (non-streamed) generateContent response.
+
+    Raises ValueError when generation didn't finish normally: a candidate
+    blocked for SAFETY or RECITATION carries no parts, and one cut off at
+    MAX_TOKENS is only a fragment of the answer.
+    """
+    text = _response_text(data)
+    finish_reason = data['candidates'][0].get('finishReason')
+    if finish_reason != 'STOP' or not text.strip():
+        raise ValueError(f"Gemini generation did not complete (finishReason={finish_reason})")
+    return text
+
+# Fallback tax strategies: (deduction the saving is computed from, static fields).
+# Only the description and potential saving depend on the user's tax bracket.
+_TAX_FALLBACK_TEMPLATES = {
+    'elss': (150000, {
+        "title": "ELSS Mutual Funds (Section 80C)",
+        "description": "Invest in Equity Linked Savings Scheme for tax deduction up to ₹1.5 lakh. With your {tax_bracket}% tax bracket, this can save you ₹{saving} annually.",
+        "potential_saving": 0,
+        "priority": "high",
+        "category": "Section 80C",
+        "action": "Open ELSS account",
+        "risk": "Medium",
+        "returns": "12-15%",
+        "lock_in": "3 years"
+    }),
+    'ppf': (150000, {
+        "title": "Public Provident Fund (PPF)",
+        "description": "Contribute to PPF for tax-free returns. With {tax_bracket}% tax bracket, this can save you ₹{saving} annually plus earn 7-8% interest.",
+        "potential_saving": 0,
+        "priority": "high",
+        "category": "Section 80C",
+        "action": "Open PPF account",
+        "risk": "Low",
+        "returns": "7-8%",
+        "lock_in": "15 years"
+    }),
+    'health': (25000, {
+        "title": "Health Insurance Premium (Section 80D)",
+        "description": "Get health insurance for family. With {tax_bracket}% tax bracket, this can save you ₹{saving} annually on ₹25,000 premium.",
+        "potential_saving": 0,
+        "priority": "high",
+        "category": "Section 80D",
+        "action": "Purchase health insurance",
+        "risk": "Low",
+        "returns": "Tax Benefit + Coverage",
+        "lock_in": "1 year"
+    }),
+    'nps': (50000, {
+        "title": "National Pension System (Section 80CCD)",
+        "description": "Invest in NPS for additional ₹50,000 deduction. With {tax_bracket}% tax bracket, this can save you ₹{saving} annually.",
+        "potential_saving": 0,
+        "priority": "medium",
+        "category": "Section 80CCD",
+        "action": "Open NPS account",
+        "risk": "Medium",
+        "returns": "8-10%",
+        "lock_in": "Till 60"
+    }),
+    'hra': (50000, {
+        "title": "HRA Exemption",
+        "description": "Claim HRA exemption if you pay rent. With {tax_bracket}% tax bracket, this can save you ₹{saving} annually on ₹50,000 HRA.",
+        "potential_saving": 0,
+        "priority": "medium",
+        "category": "HRA Exemption",
+        "action": "Submit rent receipts",
+        "risk": "Low",
+        "returns": "Tax Benefit",
+        "lock_in": "1 year"
+    })
+}
+
+def _tax_fallback(strategy: str, tax_bracket: float) -> Dict[str, Any]:
+    """Copy a fallback tax template and fill in the bracket-dependent fields"""
+    deduction, template = _TAX_FALLBACK_TEMPLATES[strategy]
+    saving = deduction * tax_bracket // 100
+    recommendation = dict(template)
+    recommendation["description"] = template["description"].format(tax_bracket=tax_bracket, saving=_rs(saving))
+    recommendation["potential_saving"] = saving
+    return recommendation
+
+@functools.lru_cache(maxsize=1024)
+def _fallback_tax_recommendations(income: float, age: int, dependents: int) -> Tuple[Dict[str, Any], ...]:
+    """Build fallback tax recommendations from the profile fields they depend on.
+
+    The result is cached and shared between callers, so it must not be mutated.
+    """
+    tax_bracket = min(30, max(5, income // 100000))
+
+    recommendations = []
+
+    # 80C deductions
+    if income > 500000:
+        recommendations.append(_tax_fallback('elss', tax_bracket))
+        recommendations.append(_tax_fallback('ppf', tax_bracket))
+
+    # 80D health insurance
+    if dependents > 0:
+        recommendations.append(_tax_fallback('health', tax_bracket))
+
+    # NPS for additional deduction
+    if age < 60:
+        recommendations.append(_tax_fallback('nps', tax_bracket))
+
+    # HRA exemption if applicable
+    if income > 800000:
+        recommendations.append(_tax_fallback('hra', tax_bracket))
+
+    return tuple(recommendations)
+
+# Fallback benefits that don't depend on the profile beyond eligibility; they
+# are shared by every cached result, so they must not be mutated either
+_UNIVERSAL_BENEFITS = (
+    {
+        "name": "Pradhan Mantri Jeevan Jyoti Bima Yojana (PMJJBY)",
+        "description": "₹2 lakh life insurance coverage for just ₹330/year. Available to all savings account holders aged 18-50.",
+        "eligibility_reason": "Age 18-50 with savings account",
+        "link": "https://www.jansuraksha.gov.in",
+        "amount": "₹2 lakh coverage",
+        "category": "Life Insurance",
+        "estimatedTime": "Instant"
+    },
+    {
+        "name": "Pradhan Mantri Suraksha Bima Yojana (PMSBY)",
+        "description": "₹2 lakh accident insurance coverage for just ₹12/year. Available to all savings account holders aged 18-70.",
+        "eligibility_reason": "Age 18-70 with savings account",
+        "link": "https://www.jansuraksha.gov.in",
+        "amount": "₹2 lakh coverage",
+        "category": "Accident Insurance",
+        "estimatedTime": "Instant"
+    }
+)
+
+_PM_KISAN_BENEFIT = {
+    "name": "PM-KISAN",
+    "description": "₹6,000/year income support for eligible farmers. Helps with agricultural expenses and family support.",
+    "eligibility_reason": "Income below ₹12 lakh, farmer",
+    "link": "https://pmkisan.gov.in",
+    "amount": "₹6,000/year",
+    "category": "Agriculture",
+    "estimatedTime": "15-30 days"
+}
+
+_AYUSHMAN_BHARAT_BENEFIT = {
+    "name": "Ayushman Bharat",
+    "description": "₹5 lakh health insurance coverage for low-income families. Covers hospitalization and medical expenses.",
+    "eligibility_reason": "Income below ₹5 lakh",
+    "link": "https://pmjay.gov.in",
+    "amount": "₹5 lakh/year",
+    "category": "Health",
+    "estimatedTime": "Instant"
+}
+
+_ATAL_PENSION_BENEFIT = {
+    "name": "Atal Pension Yojana (APY)",
+    "description": "Guaranteed pension scheme for unorganized sector workers. Provides ₹1,000-5,000 monthly pension after 60.",
+    "eligibility_reason": "Age 18-40, unorganized sector",
+    "link": "https://npscra.nsdl.co.in",
+    "amount": "₹1,000-5,000/month",
+    "category": "Pension",
+    "estimatedTime": "15-30 days"
+}
+
+_SENIOR_CITIZEN_SAVINGS_BENEFIT = {
+    "name": "Senior Citizen Savings Scheme (SCSS)",
+    "description": "High interest savings scheme for seniors with 8.2% interest rate. Maximum investment ₹30 lakh.",
+    "eligibility_reason": "Age 60 or above",
+    "link": "https://www.nsiindia.gov.in",
+    "amount": "8.2% interest",
+    "category": "Savings",
+    "estimatedTime": "7-15 days"
+}
+
+_STATE_SCHEME_STATES = frozenset({'maharashtra', 'gujarat', 'karnataka', 'tamil nadu'})
+
+@functools.lru_cache(maxsize=1024)
+def _fallback_benefits(income: float, age: int, state: str) -> Tuple[Dict[str, Any], ...]:
+    """Build fallback benefits from the profile fields they depend on.
+
+    The result is cached and shared between callers, so it must not be mutated.
+    """
+    # Universal benefits
+    benefits = list(_UNIVERSAL_BENEFITS)
+
+    # Income-based benefits
+    if income < 1200000:
+        benefits.append(_PM_KISAN_BENEFIT)
+
+    if income < 500000:
+        benefits.append(_AYUSHMAN_BHARAT_BENEFIT)
+
+    # Age-based benefits
+    if age >= 18 and age <= 40:
+        benefits.append(_ATAL_PENSION_BENEFIT)
+
+    if age >= 60:
+        benefits.append(_SENIOR_CITIZEN_SAVINGS_BENEFIT)
+
+    # Location-based benefits
+    if state and state.lower() in _STATE_SCHEME_STATES:
+        benefits.append({
+            "name": f"{state} State Benefits",
+            "description": f"Various state-specific schemes available in {state}. Visit state government portal for details.",
+            "eligibility_reason": f"Resident of {state}",
+            "link": f"https://{state.lower().replace(' ', '')}.gov.in",
+            "amount": "Varies by scheme",
+            "category": "State Schemes",
+            "estimatedTime": "15-45 days"
+        })
+
+    return tuple(benefits)
+
+@dataclass(slots=True, frozen=True)
+class Profile:
+    """The user profile fields the AI service reads, with the defaults it assumes for missing ones"""
+    income: float = 0
+    age: int = 30
+    dependents: int = 0
+    investment_amount: float = 0
+    monthly_savings: float = 0
+    emergency_fund: float = 0
+    retirement_savings: float = 0
+    occupation: str = ''
+    city: str = ''
+    state: str = ''
+    marital_status: str = ''
+    education: str = ''
+    
+    @classmethod
+    def from_dict(cls, user_profile: Dict[str, Any]) -> 'Profile':
+        """Read the fields once from a view's profile dict, ignoring the ones the service doesn't use"""
+        return cls(**{name: user_profile[name] for name in _PROFILE_FIELDS if name in user_profile})
+
+_PROFILE_FIELDS = tuple(field.name for field in fields(Profile))
+
+# Fallback chat replies by topic, looked up through _FALLBACK_TEMPLATES below
+_TAX_FALLBACK_REPLY = """**Main Advice:**
+Based on your ₹{income} annual income, you should focus on maximizing tax deductions through Section 80C investments and other eligible expenses to reduce your tax liability.
+
+**Specific Numbers:**
+Section 80C limit: ₹1.5 lakh (potential tax saving: ₹{saving_80c})
+Health insurance (80D): ₹25,000 (potential tax saving: ₹{saving_80d})
+Standard deduction: ₹50,000 (automatic)
+
+**Action Steps:**
+1. Invest in ELSS mutual funds or PPF to utilize 80C limit
+2. Purchase health insurance for family members
+3. Claim HRA if you're paying rent
+4. Consider NPS for additional ₹50,000 deduction
+
+**Timeline:**
+Start tax planning immediately. Complete 80C investments by March 31st. File ITR by July 31st.
+
+**Risks & Considerations:**
+1. Don't invest just for tax savings - choose suitable products
+2. Keep proper documentation for all deductions
+3. Consider lock-in periods of tax-saving instruments"""
+
+_INVESTMENT_FALLBACK_REPLY = """**Main Advice:**
+Given your ₹{income} income and ₹{monthly_savings} monthly savings, you should adopt a systematic investment approach focusing on long-term wealth creation through diversified investments.
+
+**Specific Numbers:**
+Monthly investment capacity: ₹{monthly_savings}
+Recommended equity allocation: ₹{equity} (70% for growth)
+Debt allocation: ₹{debt} (30% for stability)
+Expected long-term returns: 12-15% annually
+
+**Action Steps:**
+1. Start SIP in diversified equity mutual funds
+2. Allocate 20% to large-cap, 30% to mid-cap, 20% to small-cap
+3. Consider index funds for lower costs
+4. Maintain emergency fund before investing
+
+**Timeline:**
+Begin SIP immediately. Review portfolio quarterly. Rebalance annually based on market conditions.
+
+**Risks & Considerations:**
+1. Equity investments are subject to market volatility
+2. Don't invest money needed within 3-5 years
+3. Diversify across sectors and market caps"""
+
+_SAVING_FALLBACK_REPLY = """**Main Advice:**
+Building a robust emergency fund should be your top priority. With ₹{income} annual income, you need 6-12 months of expenses saved for financial security.
+
+**Specific Numbers:**
+Target emergency fund: ₹{target_fund}
+Current gap: ₹{fund_gap}
+Monthly contribution needed: ₹{contribution}
+Recommended savings rate: 20-30% of income
+
+**Action Steps:**
+1. Open high-yield savings account (4-6% interest)
+2. Set up automatic monthly transfers
+3. Cut non-essential expenses by 15-20%
+4. Consider liquid mutual funds for better returns
+
+**Timeline:**
+Achieve 3-month target in 6 months, 6-month target in 12-18 months. Review monthly.
+
+**Risks & Considerations:**
+1. Don't invest emergency funds in volatile assets
+2. Ensure 24-48 hour liquidity
+3. Consider inflation impact on purchasing power"""
+
+_DEFAULT_FALLBACK_REPLY = """**Main Advice:**
+Based on your ₹{income} income and financial profile, I recommend creating a comprehensive financial plan that balances short-term needs with long-term goals.
+
+**Specific Numbers:**
+Monthly savings potential: ₹{monthly_savings}
+Emergency fund target: ₹{target_fund}
+Investment allocation: ₹{investment} monthly
+Insurance coverage needed: ₹{insurance} (10x annual income)
+
+**Action Steps:**
+1. Build emergency fund equivalent to 6 months of expenses
+2. Start systematic investment plan (SIP) in mutual funds
+3. Purchase adequate life and health insurance
+4. Create a budget and track expenses regularly
+
+**Timeline:**
+Emergency fund: 6-12 months. Investment portfolio: Start immediately, review quarterly. Insurance: Purchase within 1 month.
+
+**Risks & Considerations:**
+1. Don't delay insurance - health issues can arise anytime
+2. Maintain adequate emergency fund before aggressive investing
+3. Consider inflation and tax implications in long-term planning"""
+
+def _emergency_fund_target(income: float) -> float:
+    """Six months of income, and never less than ₹3,00,000"""
+    return max(300000, income//12*6)
+
+def _tax_reply_context(income: float, monthly_savings: float, emergency_fund: float) -> Dict[str, str]:
+    # Income in lakhs, used as the tax rate in percent
+    lakhs = income//100000
+    return {
+        'income': _rs(income),
+        'saving_80c': _rs(lakhs*150000//100),
+        'saving_80d': _rs(lakhs*25000//100)
+    }
+
+def _investment_reply_context(income: float, monthly_savings: float, emergency_fund: float) -> Dict[str, str]:
+    return {
+        'income': _rs(income),
+        'monthly_savings': _rs(monthly_savings),
+        'equity': _rs(monthly_savings*70//100),
+        'debt': _rs(monthly_savings*30//100)
+    }
+
+def _saving_reply_context(income: float, monthly_savings: float, emergency_fund: float) -> Dict[str, str]:
+    target_fund = _emergency_fund_target(income)
+    return {
+        'income': _rs(income),
+        'target_fund': _rs(target_fund),
+        'fund_gap': _rs(max(0, target_fund - emergency_fund)),
+        'contribution': _rs(max(10000, monthly_savings//2))
+    }
+
+def _default_reply_context(income: float, monthly_savings: float, emergency_fund: float) -> Dict[str, str]:
+    return {
+        'income': _rs(income),
+        'monthly_savings': _rs(monthly_savings),
+        'target_fund': _rs(_emergency_fund_target(income)),
+        'investment': _rs(monthly_savings*80//100),
+        'insurance': _rs(income*10)
+    }
+
+# Topic -> (reply template, builder of the values it is filled in with)
+_FALLBACK_TEMPLATES = {
+    'tax': (_TAX_FALLBACK_REPLY, _tax_reply_context),
+    'investment': (_INVESTMENT_FALLBACK_REPLY, _investment_reply_context),
+    'saving': (_SAVING_FALLBACK_REPLY, _saving_reply_context),
+    'default': (_DEFAULT_FALLBACK_REPLY, _default_reply_context)
+}
+
+@functools.lru_cache(maxsize=4096)
+def _fallback_chat_reply(topic: str, income: float, monthly_savings: float, emergency_fund: float) -> str:
+    """Build the fallback reply for a topic from the profile fields the templates use.
+
+    Profiles that differ only elsewhere (city, occupation...) share one cache entry.
+    """
+    template, context = _FALLBACK_TEMPLATES[topic]
+    return template.format_map(context(income, monthly_savings, emergency_fund))
+
 class GeminiAIService:
     """AI service using Google Gemini for financial recommendations"""
     
+    __slots__ = (
+        'api_key', '_client', '_aclient', '_sem', '_sync_sem',
+        '_loop', '_prefetch_lock', '_prefetching'
+    )
+    
     def __init__(self):
         # Get Gemini API key
         self.api_key = os.getenv('GEMINI_API_KEY')
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY environment variable is required")
         
-        # Configure Gemini
-        genai.configure(api_key=self.api_key)
-        
-        # Initialize Gemini model
+        # Long-lived HTTP/2 clients so every Gemini call reuses pooled connections
         try:
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
+            client_options = {
+                'base_url': GEMINI_API_BASE,
+                'http2': True,
+                'headers': {'x-goog-api-key': self.api_key},
+                'limits': httpx.Limits(max_keepalive_connections=50, max_connections=100, keepalive_expiry=60),
+                'timeout': GEMINI_TIMEOUT
+            }
+            self._client = httpx.Client(**client_options)
+            # Async connections belong to the event loop that opened them, so
+            # the _a* coroutines only ever run on the background loop (see
+            # _on_background_loop), whichever loop awaits the public a* methods
+            self._aclient = httpx.AsyncClient(**client_options)
+            # Cap in-flight calls per worker so a traffic spike doesn't stampede Gemini
+            self._sem = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+            self._sync_sem = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENCY)
+            # Background event loop for prefetches, started on first use
+            self._loop = None
+            self._prefetch_lock = threading.Lock()
+            # Profile fingerprint -> monotonic time until which it isn't prefetched
+            # again: infinity while a prefetch runs, the cooldown end after a failure
+            self._prefetching = {}
+            # Close pooled connections cleanly when the worker exits
+            atexit.register(self.close)
             logger.info("Gemini AI service initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Gemini: {e}")
@@ -29,239 +810,389 @@ class GeminiAIService:
     
     def generate_chat_response(self, user_message: str, user_profile: Dict[str, Any]) -> Dict[str, Any]:
         """Generate a conversational response for the chatbot"""
+        profile = Profile.from_dict(user_profile)
+        profile_key = profile_fingerprint(profile)
         try:
-            # Create context-aware prompt
-            prompt = self._create_chat_prompt(user_message, user_profile)
+            return self._gemini_chat_response(user_message, profile, profile_key=profile_key)
             
-            # Generate response using Gemini
-            logger.info(f"Generating chat response with Gemini")
-            response = self.model.generate_content(prompt)
+        except Exception as e:
+            logger.error(f"Error generating chat response for profile {profile_key:016x}: {e}")
+            return self._get_fallback_chat_response(user_message, profile)
+    
+    async def agenerate_chat_response(self, user_message: str, user_profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Async version of generate_chat_response"""
+        profile = Profile.from_dict(user_profile)
+        profile_key = profile_fingerprint(profile)
+        try:
+            return await self._on_background_loop(self._agemini_chat_response(user_message, profile, profile_key=profile_key))
             
-            # Extract the generated text
-            generated_text = response.text.strip()
-            logger.info(f"Generated text: {generated_text[:200]}...")
+        except Exception as e:
+            logger.error(f"Error generating chat response for profile {profile_key:016x}: {e}")
+            return self._get_fallback_chat_response(user_message, profile)
+    
+    @semantic_cached(namespace="chat")
+    def _gemini_chat_response(self, user_message: str, profile: Profile) -> Dict[str, Any]:
+        # Create context-aware prompt
+        prompt = self._create_chat_prompt(user_message, profile)
+        
+        # Generate response using Gemini
+        logger.info(f"Generating chat response with Gemini")
+        generated_text = self._generate_content(prompt, CHAT_JSON_SYSTEM_INSTRUCTION, _CHAT_RESPONSE_SCHEMA)
+        
+        return self._build_chat_response(generated_text, user_message)
+    
+    @semantic_cached(namespace="chat")
+    async def _agemini_chat_response(self, user_message: str, profile: Profile) -> Dict[str, Any]:
+        prompt = self._create_chat_prompt(user_message, profile)
+        
+        logger.info(f"Generating chat response with Gemini (async)")
+        generated_text = await self._agenerate_content(prompt, CHAT_JSON_SYSTEM_INSTRUCTION, _CHAT_RESPONSE_SCHEMA)
+        
+        return self._build_chat_response(generated_text, user_message)
+    
+    def generate_chat_response_stream(self, user_message: str, user_profile: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Stream a chatbot response as Gemini generates it.
+
+        Yields {"chunk": text} for every partial chunk and
+        {"section": key, "text": text} as soon as each section is complete,
+        i.e. when the next section's header arrives (the last one when the
+        stream ends). If Gemini fails before sending anything, the fallback
+        reply is streamed the same way. A final event with "done": True
+        carries the same fields as generate_chat_response.
+        """
+        profile = Profile.from_dict(user_profile)
+        buffer = io.StringIO()
+        # Text received since the current section's header, and that section's key
+        pending, section = '', None
+        try:
+            prompt = self._create_chat_prompt(user_message, profile)
             
-            # Clean up the response
-            cleaned_response = self._clean_response(generated_text)
+            logger.info(f"Streaming chat response with Gemini")
+            for text in self._stream_generate_content(prompt, CHAT_SYSTEM_INSTRUCTION):
+                if text:
+                    buffer.write(text)
+                    yield {"chunk": text}
+                    
+                    pending += text
+                    start = 0
+                    for header in _SECTION_RE.finditer(pending):
+                        if section is not None:
+                            yield {"section": section, "text": pending[start:header.start()].strip()}
+                        section, start = _SECTION_KEYS[header.group(1)], header.end()
+                    pending = pending[start:]
             
-            # Parse structured response if available
-            parsed_response = self._parse_chat_response(cleaned_response)
+            if not buffer.tell():
+                raise ValueError("Gemini streamed no text")
+            if section is not None:
+                yield {"section": section, "text": pending.strip()}
             
-            return {
-                "response": parsed_response.get("formatted_response", cleaned_response),
-                "suggestions": self._generate_suggestions(user_message),
-                "confidence": 0.9,
-                "structured_data": parsed_response
-            }
+            result = self._build_streamed_chat_response(buffer.getvalue(), user_message)
             
         except Exception as e:
-            logger.error(f"Error generating chat response: {e}")
-            return self._get_fallback_chat_response(user_message, user_profile)
+            logger.error(f"Error streaming chat response: {e}")
+            result = self._get_fallback_chat_response(user_message, profile)
+            # Nothing reached the client yet: send the fallback the way a
+            # Gemini stream would arrive, so the client renders it the same way
+            if not buffer.tell():
+                yield from self._stream_fallback_chat_response(result["response"])
+        
+        yield {"done": True, **result}
+    
+    def _stream_fallback_chat_response(self, reply: str) -> Iterator[Dict[str, Any]]:
+        """Yield a fallback reply as one chunk and one section event per section"""
+        chunk_start = 0
+        for key, start, end in _iter_sections(reply):
+            yield {"chunk": reply[chunk_start:end]}
+            yield {"section": key, "text": reply[start:end].strip()}
+            chunk_start = end
+    
+    def _build_chat_response(self, generated_text: str, user_message: str) -> Dict[str, Any]:
+        """Turn a reply to CHAT_JSON_SYSTEM_INSTRUCTION into the chatbot response dict.
+
+        Raises ValueError when the reply isn't the expected JSON object (e.g. it
+        was cut off), so generate_chat_response serves the fallback and nothing
+        is cached.
+        """
+        generated_text = generated_text.strip()
+        logger.info(f"Generated text: {generated_text[:200]}...")
+        return self._chat_response(self._parse_chat_json(generated_text), user_message)
+    
+    def _build_streamed_chat_response(self, generated_text: str, user_message: str) -> Dict[str, Any]:
+        """Turn streamed markdown chat output into the chatbot response dict"""
+        generated_text = generated_text.strip()
+        logger.info(f"Generated text: {generated_text[:200]}...")
+        
+        # Clean up the response and parse its sections
+        cleaned_response = self._clean_response(generated_text)
+        return self._chat_response(self._parse_chat_response(cleaned_response), user_message)
+    
+    def _chat_response(self, parsed_response: Dict[str, Any], user_message: str) -> Dict[str, Any]:
+        return {
+            "response": parsed_response["formatted_response"],
+            "suggestions": self._generate_suggestions(user_message),
+            "confidence": 0.9,
+            "structured_data": parsed_response
+        }
     
     def generate_tax_recommendations(self, user_profile: Dict[str, Any]) -> Dict[str, Any]:
         """Generate tax savings recommendations"""
+        profile = Profile.from_dict(user_profile)
+        profile_key = profile_fingerprint(profile)
         try:
-            # Create tax-specific prompt
-            prompt = self._create_tax_prompt(user_profile)
-            
-            # Generate response using Gemini
-            logger.info(f"Generating tax recommendations with Gemini")
-            response = self.model.generate_content(prompt)
+            return self._gemini_tax_recommendations(profile, profile_key=profile_key)
             
-            generated_text = response.text.strip()
-            cleaned_response = self._clean_response(generated_text)
-            
-            # Parse the response into structured format
-            parsed_response = self._parse_tax_response(cleaned_response, user_profile)
-            logger.info(f"Parsed tax response: {parsed_response}")
-            return parsed_response
+        except Exception as e:
+            logger.error(f"Error generating tax recommendations for profile {profile_key:016x}: {e}")
+            return self._get_fallback_tax_recommendations(profile)
+    
+    async def agenerate_tax_recommendations(self, user_profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Async version of generate_tax_recommendations"""
+        profile = Profile.from_dict(user_profile)
+        profile_key = profile_fingerprint(profile)
+        try:
+            return await self._on_background_loop(self._agemini_tax_recommendations(profile, profile_key=profile_key))
             
         except Exception as e:
-            logger.error(f"Error generating tax recommendations: {e}")
-            return self._get_fallback_tax_recommendations(user_profile)
+            logger.error(f"Error generating tax recommendations for profile {profile_key:016x}: {e}")
+            return self._get_fallback_tax_recommendations(profile)
+    
+    @semantic_cached(namespace="tax")
+    def _gemini_tax_recommendations(self, profile: Profile) -> Dict[str, Any]:
+        # Create tax-specific prompt
+        prompt = self._create_tax_prompt(profile)
+        
+        # Generate response using Gemini
+        logger.info(f"Generating tax recommendations with Gemini")
+        generated_text = self._generate_content(prompt, TAX_SYSTEM_INSTRUCTION, _TAX_RESPONSE_SCHEMA)
+        
+        return self._build_tax_response(generated_text, profile)
+    
+    @semantic_cached(namespace="tax")
+    async def _agemini_tax_recommendations(self, profile: Profile) -> Dict[str, Any]:
+        prompt = self._create_tax_prompt(profile)
+        
+        logger.info(f"Generating tax recommendations with Gemini (async)")
+        generated_text = await self._agenerate_content(prompt, TAX_SYSTEM_INSTRUCTION, _TAX_RESPONSE_SCHEMA)
+        
+        return self._build_tax_response(generated_text, profile)
+    
+    def _build_tax_response(self, generated_text: str, profile: Profile) -> Dict[str, Any]:
+        """Turn Gemini's tax JSON into structured recommendations"""
+        parsed_response = self._parse_tax_response(generated_text, profile)
+        logger.info(f"Parsed tax response: {parsed_response}")
+        return parsed_response
     
     def generate_benefits_recommendations(self, user_profile: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate government benefits recommendations"""
+        profile = Profile.from_dict(user_profile)
+        profile_key = profile_fingerprint(profile)
         try:
-            # Create benefits-specific prompt
-            prompt = self._create_benefits_prompt(user_profile)
-            
-            # Generate response using Gemini
-            logger.info(f"Generating benefits recommendations with Gemini")
-            response = self.model.generate_content(prompt)
+            return self._gemini_benefits_recommendations(profile, profile_key=profile_key)
             
-            generated_text = response.text.strip()
-            cleaned_response = self._clean_response(generated_text)
-            
-            # Parse the response into structured format
-            return self._parse_benefits_response(cleaned_response, user_profile)
+        except Exception as e:
+            logger.error(f"Error generating benefits recommendations for profile {profile_key:016x}: {e}")
+            return self._get_fallback_benefits(profile)
+    
+    async def agenerate_benefits_recommendations(self, user_profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Async version of generate_benefits_recommendations"""
+        profile = Profile.from_dict(user_profile)
+        profile_key = profile_fingerprint(profile)
+        try:
+            return await self._on_background_loop(self._agemini_benefits_recommendations(profile, profile_key=profile_key))
             
         except Exception as e:
-            logger.error(f"Error generating benefits recommendations: {e}")
-            return self._get_fallback_benefits(user_profile)
-    
-    def _create_chat_prompt(self, user_message: str, user_profile: Dict[str, Any]) -> str:
-        """Create a context-aware prompt for chat"""
-        income = user_profile.get('income', 0)
-        age = user_profile.get('age', 30)
-        investment_amount = user_profile.get('investment_amount', 0)
-        dependents = user_profile.get('dependents', 0)
-        occupation = user_profile.get('occupation', '')
-        city = user_profile.get('city', '')
-        monthly_savings = user_profile.get('monthly_savings', 0)
-        emergency_fund = user_profile.get('emergency_fund', 0)
-        retirement_savings = user_profile.get('retirement_savings', 0)
-        
-        prompt = f"""You are an expert financial advisor with 20+ years of experience specializing in Indian financial markets. You provide clear, actionable, and professional financial advice.
-
-User Profile:
-- Income: ₹{income:,} per year (₹{income//12:,}/month)
-- Age: {age} years old
-- Investment Amount: ₹{investment_amount:,}
-- Dependents: {dependents}
-- Occupation: {occupation}
-- Location: {city}
-- Monthly Savings: ₹{monthly_savings:,}
-- Emergency Fund: ₹{emergency_fund:,}
-- Retirement Savings: ₹{retirement_savings:,}
-
-User Question: {user_message}
-
-Provide comprehensive, professional financial advice in this EXACT format:
-
-**Main Advice:** [Provide 2-3 complete sentences with your primary recommendation. Be specific about what they should do and why it's important for their financial situation.]
-
-**Specific Numbers:** [Give exact amounts, percentages, calculations, or specific figures in ₹. Include at least 2-3 specific numbers relevant to their question. If asking about investments, provide expected returns. If about savings, give target amounts.]
-
-**Action Steps:** [List 3-4 specific, actionable steps they can take immediately. Each step should be clear and implementable. Number them 1, 2, 3, 4.]
-
-**Timeline:** [Provide specific timeline for implementation. Include short-term (1-3 months), medium-term (3-12 months), and long-term (1+ years) actions if applicable.]
-
-**Risks & Considerations:** [List 2-3 important risks, limitations, or factors they should consider. Include how to mitigate these risks.]
-
-IMPORTANT REQUIREMENTS:
-1. Fill ALL sections completely - no empty or incomplete responses
-2. Use specific numbers and amounts in Indian Rupees (₹)
-3. Make advice actionable and implementable
-4. Consider their exact financial profile
-5. Reference Indian financial products and tax laws when relevant
-6. Be professional, clear, and comprehensive
-7. Each section must have substantial, useful content
-
-Focus on Indian financial context:
-- Indian tax laws (80C, 80D, 80CCD deductions)
-- Indian investment products (ELSS, PPF, NPS, mutual funds)
-- Indian government schemes (PM-KISAN, Ayushman Bharat, etc.)
-- Indian banking and insurance products
-- Indian real estate and gold investment options
-
-Example of good response:
-**Main Advice:** Based on your ₹{income:,} annual income, you should prioritize building an emergency fund equivalent to 6 months of expenses. This provides financial security and prevents debt during unexpected situations.
-
-**Specific Numbers:** Target emergency fund: ₹{max(300000, income//12*6):,}. Current gap: ₹{max(0, max(300000, income//12*6) - emergency_fund):,}. Monthly contribution needed: ₹{max(0, (max(300000, income//12*6) - emergency_fund)//12):,}.
-
-**Action Steps:** 1. Open a high-yield savings account with 4-6% interest rate. 2. Set up automatic monthly transfers of ₹{max(10000, monthly_savings//2):,}. 3. Reduce non-essential expenses by 15-20%. 4. Consider liquid mutual funds for better returns.
-
-**Timeline:** Start emergency fund building immediately. Achieve 3-month target in 6 months, 6-month target in 12-18 months. Review and adjust monthly contributions quarterly.
-
-**Risks & Considerations:** 1. Don't invest emergency funds in volatile assets. 2. Ensure easy liquidity within 24-48 hours. 3. Consider inflation impact on purchasing power over time.
-
-Now provide your response following this exact format and quality standard."""
-        return prompt
-    
-    def _create_tax_prompt(self, user_profile: Dict[str, Any]) -> str:
-        """Create a prompt for tax recommendations"""
-        income = user_profile.get('income', 0)
-        age = user_profile.get('age', 30)
-        dependents = user_profile.get('dependents', 0)
-        investment_amount = user_profile.get('investment_amount', 0)
-        occupation = user_profile.get('occupation', '')
-        marital_status = user_profile.get('marital_status', '')
-        
-        prompt = f"""As a tax expert specializing in Indian tax laws, provide 5-7 specific tax savings recommendations for:
-
-Profile:
-- Income: ₹{income:,} per year
-- Age: {age} years old
-- Dependents: {dependents}
-- Current Investments: ₹{investment_amount:,}
-- Occupation: {occupation}
-- Marital Status: {marital_status}
-
-Provide detailed tax-saving strategies in this EXACT format:
-
-**Strategy:** [Strategy Name]
-**Amount:** [Investment amount in ₹]
-**Savings:** [Tax savings in ₹ - calculate based on {income//100000}% tax bracket]
-**Implementation:** [Step-by-step implementation]
-**Priority:** [High/Medium/Low]
-**Risk Level:** [Low/Medium/High]
-**Lock-in Period:** [Duration]
-
-Focus on Indian tax laws and products like:
-- ELSS mutual funds (80C) - ₹1.5 lakh limit
-- PPF (Public Provident Fund) - ₹1.5 lakh limit
-- NPS (National Pension System) - ₹2 lakh limit
-- Health insurance premiums (80D) - ₹25,000 limit
-- Home loan interest (80C) - ₹2 lakh limit
-- Education loan interest (80E) - No limit
-- HRA exemptions
-- Standard deduction of ₹50,000
-- Professional tax deductions
-
-Calculate actual savings based on their {income//100000}% tax bracket. Provide at least 5 specific recommendations with exact amounts in Indian Rupees.
-
-IMPORTANT: Use the exact format above with **bold labels** for each section. Make sure each strategy is clearly separated."""
-        return prompt
-    
-    def _create_benefits_prompt(self, user_profile: Dict[str, Any]) -> str:
-        """Create a prompt for benefits recommendations"""
-        income = user_profile.get('income', 0)
-        age = user_profile.get('age', 30)
-        occupation = user_profile.get('occupation', '')
-        city = user_profile.get('city', '')
-        state = user_profile.get('state', '')
-        dependents = user_profile.get('dependents', 0)
-        education = user_profile.get('education', '')
-        
-        prompt = f"""As a government benefits expert specializing in Indian government schemes, recommend 5-7 specific available programs for:
-
-Profile:
-- Income: ₹{income:,} per year
-- Age: {age} years old
-- Occupation: {occupation}
-- Location: {city}, {state}
-- Dependents: {dependents}
-- Education: {education}
-
-Provide detailed Indian government benefits in this EXACT format:
-
-**Program:** [Program Name]
-**Category:** [Category - Health/Insurance/Savings/etc.]
-**Eligibility:** [Specific eligibility criteria]
-**Amount:** [Benefit amount in ₹]
-**Application:** [Step-by-step application process]
-**Timeline:** [Approval and disbursement timeline]
-**Documents:** [Required documents]
-
-Focus on Indian government schemes like:
-- PM-KISAN: ₹6,000/year for farmers
-- Ayushman Bharat: ₹5 lakh health insurance
-- PMAY (Pradhan Mantri Awas Yojana): Housing subsidy
-- Mudra Loan: Micro business loans
-- PMJJBY: ₹2 lakh life insurance for ₹330/year
-- PMSBY: ₹2 lakh accident insurance for ₹12/year
-- Atal Pension Yojana: Guaranteed pension
-- Sukanya Samriddhi Yojana: Girl child savings
-- PM Fasal Bima Yojana: Crop insurance
-- PM Ujjwala Yojana: LPG connection
-- PM Garib Kalyan Yojana: Free food grains
-- State-specific schemes for {state}
-
-Recommend programs they likely qualify for based on their profile. Provide at least 5 specific benefits with exact amounts and application steps.
-
-IMPORTANT: Use the exact format above with **bold labels** for each section. Make sure each program is clearly separated."""
-        return prompt
+            logger.error(f"Error generating benefits recommendations for profile {profile_key:016x}: {e}")
+            return self._get_fallback_benefits(profile)
+    
+    @semantic_cached(namespace="benefits")
+    def _gemini_benefits_recommendations(self, profile: Profile) -> List[Dict[str, Any]]:
+        # Create benefits-specific prompt
+        prompt = self._create_benefits_prompt(profile)
+        
+        # Generate response using Gemini
+        logger.info(f"Generating benefits recommendations with Gemini")
+        generated_text = self._generate_content(prompt, BENEFITS_SYSTEM_INSTRUCTION, _BENEFITS_RESPONSE_SCHEMA)
+        
+        return self._build_benefits_response(generated_text, profile)
+    
+    @semantic_cached(namespace="benefits")
+    async def _agemini_benefits_recommendations(self, profile: Profile) -> List[Dict[str, Any]]:
+        prompt = self._create_benefits_prompt(profile)
+        
+        logger.info(f"Generating benefits recommendations with Gemini (async)")
+        generated_text = await self._agenerate_content(prompt, BENEFITS_SYSTEM_INSTRUCTION, _BENEFITS_RESPONSE_SCHEMA)
+        
+        return self._build_benefits_response(generated_text, profile)
+    
+    def _build_benefits_response(self, generated_text: str, profile: Profile) -> List[Dict[str, Any]]:
+        """Turn Gemini's benefits JSON into structured benefits"""
+        return self._parse_benefits_response(generated_text, profile)
+    
+    def prefetch_recommendations(self, user_profile: Dict[str, Any]) -> None:
+        """Warm the semantic cache with tax and benefits recommendations.
+
+        Both are generated concurrently on a background event loop and the
+        call returns immediately, so a later generate_tax_recommendations or
+        generate_benefits_recommendations for the same profile is a cache hit.
+        Each Gemini call is tried once; failures are logged and left for the
+        real request to retry, and the profile isn't prefetched again for
+        PREFETCH_FAILURE_COOLDOWN seconds.
+        """
+        profile = Profile.from_dict(user_profile)
+        profile_key = profile_fingerprint(profile)
+        with self._prefetch_lock:
+            if self._prefetching.get(profile_key, 0) > time.monotonic():
+                return
+            self._prefetching[profile_key] = float('inf')
+        
+        loop = self._background_loop()
+        futures = [
+            asyncio.run_coroutine_threadsafe(self._prefetch(self._agemini_tax_recommendations(profile, profile_key=profile_key)), loop),
+            asyncio.run_coroutine_threadsafe(self._prefetch(self._agemini_benefits_recommendations(profile, profile_key=profile_key)), loop)
+        ]
+        
+        def finished(future):
+            if future.exception() is not None:
+                logger.warning(f"Prefetch for profile {profile_key:016x} failed: {future.exception()}")
+            if all(f.done() for f in futures):
+                now = time.monotonic()
+                with self._prefetch_lock:
+                    if any(f.exception() is not None for f in futures):
+                        # Drop expired cooldowns so failed profiles don't pile up
+                        self._prefetching = {k: t for k, t in self._prefetching.items() if t > now}
+                        self._prefetching[profile_key] = now + PREFETCH_FAILURE_COOLDOWN
+                    else:
+                        self._prefetching.pop(profile_key, None)
+        
+        for future in futures:
+            future.add_done_callback(finished)
+    
+    def close(self) -> None:
+        """Close the pooled HTTP clients and stop the prefetch loop"""
+        self._client.close()
+        with self._prefetch_lock:
+            loop, self._loop = self._loop, None
+        try:
+            if loop is None:
+                asyncio.run(self._aclient.aclose())
+            else:
+                # The async client's connections belong to the prefetch loop
+                asyncio.run_coroutine_threadsafe(self._aclient.aclose(), loop).result(timeout=5)
+                loop.call_soon_threadsafe(loop.stop)
+        except Exception as e:
+            logger.warning(f"Error closing async Gemini client: {e}")
+    
+    async def _prefetch(self, coroutine):
+        """Await a prefetch coroutine with its Gemini calls limited to one attempt"""
+        _in_prefetch.set(True)
+        return await coroutine
+    
+    async def _on_background_loop(self, coroutine):
+        """Run a coroutine on the background loop and await its result from the caller's loop"""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, self._background_loop()))
+    
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        """Daemon-thread event loop that owns the async client; prefetches and the a* methods run on it"""
+        with self._prefetch_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="gemini-prefetch", daemon=True).start()
+            return self._loop
+    
+    def _generate_content(self, prompt: str, system_instruction: str, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """Call Gemini generateContent and return the generated text"""
+        body = _request_body(prompt, system_instruction, response_schema)
+        for attempt in Retrying(**_RETRY_OPTIONS):
+            with attempt, self._sync_sem:
+                response = self._client.post(f"/models/{GEMINI_MODEL}:generateContent", json=body)
+                response.raise_for_status()
+        return _generated_text(orjson.loads(response.content))
+    
+    async def _agenerate_content(self, prompt: str, system_instruction: str, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """Async version of _generate_content"""
+        body = _request_body(prompt, system_instruction, response_schema)
+        async for attempt in AsyncRetrying(**(_PREFETCH_RETRY_OPTIONS if _in_prefetch.get() else _RETRY_OPTIONS)):
+            with attempt:
+                async with self._sem:
+                    response = await self._aclient.post(f"/models/{GEMINI_MODEL}:generateContent", json=body)
+                    response.raise_for_status()
+        return _generated_text(orjson.loads(response.content))
+    
+    def _stream_generate_content(self, prompt: str, system_instruction: str) -> Iterator[str]:
+        """Call Gemini streamGenerateContent and yield text as it arrives"""
+        with self._client.stream(
+            "POST",
+            f"/models/{GEMINI_MODEL}:streamGenerateContent",
+            params={"alt": "sse"},
+            json=_request_body(prompt, system_instruction)
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line.startswith("data: "):
+                    yield _response_text(orjson.loads(line[len("data: "):]))
+    
+    def _embed(self, text: str) -> List[float]:
+        """Embed text for semantic cache lookups"""
+        response = self._client.post(
+            f"/models/{EMBEDDING_MODEL}:embedContent",
+            json={"content": {"parts": [{"text": text}]}},
+            timeout=GEMINI_EMBED_TIMEOUT
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)['embedding']['values']
+    
+    async def _aembed(self, text: str) -> List[float]:
+        """Async version of _embed"""
+        response = await self._aclient.post(
+            f"/models/{EMBEDDING_MODEL}:embedContent",
+            json={"content": {"parts": [{"text": text}]}},
+            timeout=GEMINI_EMBED_TIMEOUT
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)['embedding']['values']
+    
+    def _create_chat_prompt(self, user_message: str, profile: Profile) -> str:
+        """Create the per-request chat contents (rubric is in the chat system instructions)"""
+        income = profile.income
+        profile_fields = (
+            ('income', income),
+            ('monthly_income', income // 12),
+            ('age', profile.age),
+            ('investment_amount', profile.investment_amount),
+            ('dependents', profile.dependents),
+            ('occupation', profile.occupation),
+            ('city', profile.city),
+            ('monthly_savings', profile.monthly_savings),
+            ('emergency_fund', profile.emergency_fund),
+            ('retirement_savings', profile.retirement_savings)
+        )
+        return f'{{"profile":{_profile_json(profile_fields)},"question":{_compact_json(user_message)}}}'
+    
+    def _create_tax_prompt(self, profile: Profile) -> str:
+        """Create the per-request tax contents (rubric is in TAX_SYSTEM_INSTRUCTION)"""
+        income = profile.income
+        profile_fields = (
+            ('income', income),
+            ('age', profile.age),
+            ('dependents', profile.dependents),
+            ('investment_amount', profile.investment_amount),
+            ('occupation', profile.occupation),
+            ('marital_status', profile.marital_status)
+        )
+        return f'{{"profile":{_profile_json(profile_fields)},"tax_bracket":"{int(income // 100000)}%"}}'
+    
+    def _create_benefits_prompt(self, profile: Profile) -> str:
+        """Create the per-request benefits contents (rubric is in BENEFITS_SYSTEM_INSTRUCTION)"""
+        profile_fields = (
+            ('income', profile.income),
+            ('age', profile.age),
+            ('occupation', profile.occupation),
+            ('city', profile.city),
+            ('state', profile.state),
+            ('dependents', profile.dependents),
+            ('education', profile.education)
+        )
+        return f'{{"profile":{_profile_json(profile_fields)}}}'
     
     def _clean_response(self, generated_text: str) -> str:
         """Clean up the generated response"""
@@ -269,117 +1200,31 @@ IMPORTANT: Use the exact format above with **bold labels** for each section. Mak
             return "I'm sorry, I couldn't generate a response at this time. Please try again."
         
         # Clean up any artifacts
-        response = generated_text.strip()
-        response = response.replace('\n\n', '\n').strip()
+        response = _BLANK_LINES_RE.sub('\n', generated_text.strip()).strip()
         
         # Remove any incomplete sentences at the end
         if response and response[-1] not in '.!?':
-            # Find the last complete sentence
-            sentences = response.split('.')
-            if len(sentences) > 1:
-                response = '.'.join(sentences[:-1]) + '.'
+            # Keep everything up to the last complete sentence
+            last_sentence = _LAST_SENTENCE_RE.match(response)
+            if last_sentence:
+                response = last_sentence.group(1)
         
         return response
     
-    def _parse_tax_response(self, response: str, user_profile: Dict[str, Any]) -> Dict[str, Any]:
-        """Parse tax response into structured format"""
-        try:
-            # Try to extract JSON from the response
-            start = response.find('{')
-            end = response.rfind('}') + 1
-            if start != -1 and end > start:
-                json_str = response[start:end]
-                data = json.loads(json_str)
-                return data
-        except:
-            pass
-        
-        # If no JSON found, create structured recommendations from the text
-        income = user_profile.get('income', 0)
-        tax_bracket = min(30, max(5, income // 100000))  # 5% to 30% tax bracket
-        
-        # Create multiple recommendations by parsing the AI response
-        recommendations = []
+    def _parse_tax_response(self, response: str, profile: Profile) -> Dict[str, Any]:
+        """Wrap the schema-shaped recommendations from Gemini with their summary"""
+        recommendations = _object_list(orjson.loads(response), "Tax recommendations")
         
-        # Split response into sections and parse each recommendation
-        sections = response.split('**Strategy:**')
-        
-        for section in sections[1:]:  # Skip first empty section
-            lines = section.strip().split('\n')
-            if not lines:
-                continue
-                
-            # Extract strategy name
-            strategy_name = lines[0].strip()
-            
-            # Parse the section for details
-            amount = 0
-            description = ""
-            priority = "medium"
-            category = "Tax Optimization"
-            action = "Review Options"
-            risk = "Low"
-            returns = "Tax Savings"
-            lock_in = "1 year"
-            
-            for line in lines:
-                line = line.strip()
-                if '**Amount:**' in line:
-                    # Extract amount information
-                    amount_text = line.replace('**Amount:**', '').strip()
-                    # Try to extract numeric value
-                    amount_match = re.search(r'₹([\d,]+)', amount_text)
-                    if amount_match:
-                        amount = int(amount_match.group(1).replace(',', ''))
-                elif '**Savings:**' in line:
-                    # Extract savings information
-                    savings_text = line.replace('**Savings:**', '').strip()
-                    savings_match = re.search(r'₹([\d,]+)', savings_text)
-                    if savings_match:
-                        amount = int(savings_match.group(1).replace(',', ''))
-                elif '**Priority:**' in line:
-                    priority = line.replace('**Priority:**', '').strip().lower()
-                elif '**Risk Level:**' in line:
-                    risk = line.replace('**Risk Level:**', '').strip()
-                elif '**Lock-in Period:**' in line:
-                    lock_in = line.replace('**Lock-in Period:**', '').strip()
-                elif line and not line.startswith('**'):
-                    description += line + " "
-            
-            # Clean up description
-            description = description.strip()
-            if not description:
-                description = f"Tax optimization strategy: {strategy_name}"
-            
-            # Calculate potential savings if not found
-            if amount == 0:
-                # Estimate based on strategy type
-                if '80C' in strategy_name or 'ELSS' in strategy_name or 'PPF' in strategy_name:
-                    amount = 150000 * tax_bracket // 100
-                elif '80D' in strategy_name or 'health' in strategy_name.lower():
-                    amount = 25000 * tax_bracket // 100
-                elif 'NPS' in strategy_name or '80CCD' in strategy_name:
-                    amount = 50000 * tax_bracket // 100
-                elif 'HRA' in strategy_name or 'rent' in strategy_name.lower():
-                    amount = 50000 * tax_bracket // 100
-                else:
-                    amount = 10000 * tax_bracket // 100
-            
-            recommendations.append({
-                "title": strategy_name,
-                "description": description,
-                "potential_saving": amount,
-                "priority": priority,
-                "category": category,
-                "action": action,
-                "risk": risk,
-                "returns": returns,
-                "lock_in": lock_in
-            })
-        
-        # If we couldn't parse any recommendations, create fallback ones
+        # If Gemini returned no recommendations, serve fallback ones without caching them
         if not recommendations:
-            recommendations = self._create_fallback_tax_recommendations(user_profile)
+            raise UncachedResponse(self._tax_response(self._create_fallback_tax_recommendations(profile), profile))
+        
+        return self._tax_response(recommendations, profile)
+    
+    def _tax_response(self, recommendations: List[Dict[str, Any]], profile: Profile) -> Dict[str, Any]:
+        """Tax recommendations with their savings summary"""
+        income = profile.income
+        tax_bracket = min(30, max(5, income // 100000))  # 5% to 30% tax bracket
         
         # Calculate total potential savings
         total_savings = sum(r.get("potential_saving", 0) for r in recommendations)
@@ -394,434 +1239,51 @@ IMPORTANT: Use the exact format above with **bold labels** for each section. Mak
             }
         }
     
-    def _create_fallback_tax_recommendations(self, user_profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _create_fallback_tax_recommendations(self, profile: Profile) -> List[Dict[str, Any]]:
         """Create comprehensive fallback tax recommendations"""
-        income = user_profile.get('income', 0)
-        age = user_profile.get('age', 30)
-        dependents = user_profile.get('dependents', 0)
-        tax_bracket = min(30, max(5, income // 100000))
-        
-        recommendations = []
-        
-        # 80C deductions
-        if income > 500000:
-            recommendations.append({
-                "title": "ELSS Mutual Funds (Section 80C)",
-                "description": f"Invest in Equity Linked Savings Scheme for tax deduction up to ₹1.5 lakh. With your {tax_bracket}% tax bracket, this can save you ₹{150000 * tax_bracket // 100:,} annually.",
-                "potential_saving": 150000 * tax_bracket // 100,
-                "priority": "high",
-                "category": "Section 80C",
-                "action": "Open ELSS account",
-                "risk": "Medium",
-                "returns": "12-15%",
-                "lock_in": "3 years"
-            })
-            
-            recommendations.append({
-                "title": "Public Provident Fund (PPF)",
-                "description": f"Contribute to PPF for tax-free returns. With {tax_bracket}% tax bracket, this can save you ₹{150000 * tax_bracket // 100:,} annually plus earn 7-8% interest.",
-                "potential_saving": 150000 * tax_bracket // 100,
-                "priority": "high",
-                "category": "Section 80C",
-                "action": "Open PPF account",
-                "risk": "Low",
-                "returns": "7-8%",
-                "lock_in": "15 years"
-            })
-        
-        # 80D health insurance
-        if dependents > 0:
-            recommendations.append({
-                "title": "Health Insurance Premium (Section 80D)",
-                "description": f"Get health insurance for family. With {tax_bracket}% tax bracket, this can save you ₹{25000 * tax_bracket // 100:,} annually on ₹25,000 premium.",
-                "potential_saving": 25000 * tax_bracket // 100,
-                "priority": "high",
-                "category": "Section 80D",
-                "action": "Purchase health insurance",
-                "risk": "Low",
-                "returns": "Tax Benefit + Coverage",
-                "lock_in": "1 year"
-            })
-        
-        # NPS for additional deduction
-        if age < 60:
-            recommendations.append({
-                "title": "National Pension System (Section 80CCD)",
-                "description": f"Invest in NPS for additional ₹50,000 deduction. With {tax_bracket}% tax bracket, this can save you ₹{50000 * tax_bracket // 100:,} annually.",
-                "potential_saving": 50000 * tax_bracket // 100,
-                "priority": "medium",
-                "category": "Section 80CCD",
-                "action": "Open NPS account",
-                "risk": "Medium",
-                "returns": "8-10%",
-                "lock_in": "Till 60"
-            })
-        
-        # HRA exemption if applicable
-        if income > 800000:
-            recommendations.append({
-                "title": "HRA Exemption",
-                "description": f"Claim HRA exemption if you pay rent. With {tax_bracket}% tax bracket, this can save you ₹{50000 * tax_bracket // 100:,} annually on ₹50,000 HRA.",
-                "potential_saving": 50000 * tax_bracket // 100,
-                "priority": "medium",
-                "category": "HRA Exemption",
-                "action": "Submit rent receipts",
-                "risk": "Low",
-                "returns": "Tax Benefit",
-                "lock_in": "1 year"
-            })
-        
-        return recommendations
+        return list(_fallback_tax_recommendations(
+            profile.income,
+            profile.age,
+            profile.dependents
+        ))
     
-    def _parse_benefits_response(self, response: str, user_profile: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Parse benefits response into structured format"""
-        try:
-            # Try to extract JSON array from the response
-            start = response.find('[')
-            end = response.rfind(']') + 1
-            if start != -1 and end > start:
-                json_str = response[start:end]
-                data = json.loads(json_str)
-                return data
-        except:
-            pass
-        
-        # If no JSON found, create structured benefits from the text
-        benefits = []
-        
-        # Split response into sections and parse each benefit
-        sections = response.split('**Program:**')
-        
-        for section in sections[1:]:  # Skip first empty section
-            lines = section.strip().split('\n')
-            if not lines:
-                continue
-                
-            # Extract program name
-            program_name = lines[0].strip()
-            
-            # Parse the section for details
-            category = "Government Scheme"
-            eligibility = "Based on your profile"
-            amount = "₹500-1000"
-            application = "Visit government portal"
-            timeline = "15-30 days"
-            documents = "ID proof, income certificate"
-            
-            for line in lines:
-                line = line.strip()
-                if '**Category:**' in line:
-                    category = line.replace('**Category:**', '').strip()
-                elif '**Eligibility:**' in line:
-                    eligibility = line.replace('**Eligibility:**', '').strip()
-                elif '**Amount:**' in line:
-                    amount = line.replace('**Amount:**', '').strip()
-                elif '**Application:**' in line:
-                    application = line.replace('**Application:**', '').strip()
-                elif '**Timeline:**' in line:
-                    timeline = line.replace('**Timeline:**', '').strip()
-                elif '**Documents:**' in line:
-                    documents = line.replace('**Documents:**', '').strip()
-                elif line and not line.startswith('**'):
-                    # This is additional description
-                    pass
-            
-            # Clean up and create benefit object
-            description = f"{program_name} - {category}. {eligibility}. {application}. Timeline: {timeline}. Required: {documents}."
-            
-            benefits.append({
-                "name": program_name,
-                "description": description,
-                "eligibility_reason": eligibility,
-                "link": "https://www.india.gov.in/topics/benefits",
-                "amount": amount,
-                "category": category,
-                "estimatedTime": timeline
-            })
+    def _parse_benefits_response(self, response: str, profile: Profile) -> List[Dict[str, Any]]:
+        """Decode the schema-shaped benefits from Gemini"""
+        benefits = _object_list(orjson.loads(response), "Benefits")
         
-        # If we couldn't parse any benefits, create fallback ones
+        # If Gemini returned no benefits, serve fallback ones without caching them
         if not benefits:
-            benefits = self._create_fallback_benefits(user_profile)
+            raise UncachedResponse(self._create_fallback_benefits(profile))
+        
+        for benefit in benefits:
+            benefit["link"] = BENEFITS_PORTAL
         
         return benefits
     
-    def _create_fallback_benefits(self, user_profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _create_fallback_benefits(self, profile: Profile) -> List[Dict[str, Any]]:
         """Create comprehensive fallback benefits recommendations"""
-        income = user_profile.get('income', 0)
-        age = user_profile.get('age', 30)
-        dependents = user_profile.get('dependents', 0)
-        city = user_profile.get('city', '')
-        state = user_profile.get('state', '')
-        
-        benefits = []
-        
-        # Universal benefits
-        benefits.append({
-            "name": "Pradhan Mantri Jeevan Jyoti Bima Yojana (PMJJBY)",
-            "description": "₹2 lakh life insurance coverage for just ₹330/year. Available to all savings account holders aged 18-50.",
-            "eligibility_reason": "Age 18-50 with savings account",
-            "link": "https://www.jansuraksha.gov.in",
-            "amount": "₹2 lakh coverage",
-            "category": "Life Insurance",
-            "estimatedTime": "Instant"
-        })
-        
-        benefits.append({
-            "name": "Pradhan Mantri Suraksha Bima Yojana (PMSBY)",
-            "description": "₹2 lakh accident insurance coverage for just ₹12/year. Available to all savings account holders aged 18-70.",
-            "eligibility_reason": "Age 18-70 with savings account",
-            "link": "https://www.jansuraksha.gov.in",
-            "amount": "₹2 lakh coverage",
-            "category": "Accident Insurance",
-            "estimatedTime": "Instant"
-        })
-        
-        # Income-based benefits
-        if income < 1200000:
-            benefits.append({
-                "name": "PM-KISAN",
-                "description": "₹6,000/year income support for eligible farmers. Helps with agricultural expenses and family support.",
-                "eligibility_reason": "Income below ₹12 lakh, farmer",
-                "link": "https://pmkisan.gov.in",
-                "amount": "₹6,000/year",
-                "category": "Agriculture",
-                "estimatedTime": "15-30 days"
-            })
-        
-        if income < 500000:
-            benefits.append({
-                "name": "Ayushman Bharat",
-                "description": "₹5 lakh health insurance coverage for low-income families. Covers hospitalization and medical expenses.",
-                "eligibility_reason": "Income below ₹5 lakh",
-                "link": "https://pmjay.gov.in",
-                "amount": "₹5 lakh/year",
-                "category": "Health",
-                "estimatedTime": "Instant"
-            })
-        
-        # Age-based benefits
-        if age >= 18 and age <= 40:
-            benefits.append({
-                "name": "Atal Pension Yojana (APY)",
-                "description": "Guaranteed pension scheme for unorganized sector workers. Provides ₹1,000-5,000 monthly pension after 60.",
-                "eligibility_reason": "Age 18-40, unorganized sector",
-                "link": "https://npscra.nsdl.co.in",
-                "amount": "₹1,000-5,000/month",
-                "category": "Pension",
-                "estimatedTime": "15-30 days"
-            })
-        
-        if age >= 60:
-            benefits.append({
-                "name": "Senior Citizen Savings Scheme (SCSS)",
-                "description": "High interest savings scheme for seniors with 8.2% interest rate. Maximum investment ₹30 lakh.",
-                "eligibility_reason": "Age 60 or above",
-                "link": "https://www.nsiindia.gov.in",
-                "amount": "8.2% interest",
-                "category": "Savings",
-                "estimatedTime": "7-15 days"
-            })
-        
-        # Location-based benefits
-        if state and state.lower() in ['maharashtra', 'gujarat', 'karnataka', 'tamil nadu']:
-            benefits.append({
-                "name": f"{state} State Benefits",
-                "description": f"Various state-specific schemes available in {state}. Visit state government portal for details.",
-                "eligibility_reason": f"Resident of {state}",
-                "link": f"https://{state.lower().replace(' ', '')}.gov.in",
-                "amount": "Varies by scheme",
-                "category": "State Schemes",
-                "estimatedTime": "15-45 days"
-            })
-        
-        return benefits
+        return list(_fallback_benefits(
+            profile.income,
+            profile.age,
+            profile.state
+        ))
     
-    def _generate_suggestions(self, user_message: str) -> List[str]:
+    def _generate_suggestions(self, user_message: str) -> Tuple[str, ...]:
         """Generate follow-up suggestions based on user message"""
-        message_lower = user_message.lower()
-        
-        if 'investment' in message_lower:
-            suggestions = [
-                "What's the best investment strategy for my age?",
-                "How much should I invest monthly?",
-                "What are the risks of this investment?",
-                "Show me low-risk investment options",
-                "Which tax-saving investments are best for me?",
-                "How do I diversify my portfolio?"
-            ]
-        elif 'saving' in message_lower or 'budget' in message_lower:
-            suggestions = [
-                "How much should I save each month?",
-                "What's the best way to budget my income?",
-                "How do I build an emergency fund?",
-                "What are good savings goals?",
-                "How can I automate my savings?",
-                "What's the 50/30/20 rule?"
-            ]
-        elif 'tax' in message_lower:
-            suggestions = [
-                "What tax deductions can I claim?",
-                "How can I reduce my tax bill?",
-                "What are the best tax-saving investments?",
-                "When should I file my taxes?",
-                "How much can I save with 80C deductions?",
-                "What's the difference between 80C and 80CCD?"
-            ]
-        elif 'debt' in message_lower or 'loan' in message_lower:
-            suggestions = [
-                "How do I pay off debt faster?",
-                "What's the best debt payoff strategy?",
-                "Should I consolidate my loans?",
-                "How much debt is too much?",
-                "What's the debt avalanche method?",
-                "How do I prioritize debt payments?"
-            ]
-        elif 'retirement' in message_lower:
-            suggestions = [
-                "How much should I save for retirement?",
-                "What's the best retirement account?",
-                "When should I start retirement planning?",
-                "How do I calculate retirement needs?",
-                "What's the difference between EPF and NPS?",
-                "How do I maximize retirement savings?"
-            ]
-        elif 'emergency' in message_lower or 'fund' in message_lower:
-            suggestions = [
-                "How much should I have in emergency fund?",
-                "Where should I keep my emergency fund?",
-                "How do I build an emergency fund quickly?",
-                "What counts as an emergency expense?",
-                "Should I invest my emergency fund?",
-                "How often should I review my emergency fund?"
-            ]
-        elif 'insurance' in message_lower:
-            suggestions = [
-                "How much life insurance do I need?",
-                "What's the best health insurance plan?",
-                "Should I get term or whole life insurance?",
-                "How do I choose the right insurance?",
-                "What are government insurance schemes?",
-                "How much should I pay for insurance?"
-            ]
-        else:
-            suggestions = [
-                "Tell me more about this",
-                "How can I implement this?",
-                "What are the risks?",
-                "Show me alternatives",
-                "Give me specific numbers",
-                "What's the next step?"
-            ]
-        
-        return suggestions
-    
-    def _get_fallback_chat_response(self, user_message: str, user_profile: Dict[str, Any]) -> Dict[str, Any]:
+        _, topic = _find_topics(user_message)
+        return _SUGGESTIONS[topic or 'default']
+    
+    def _get_fallback_chat_response(self, user_message: str, profile: Profile) -> Dict[str, Any]:
         """Provide a fallback response when AI service fails"""
-        income = user_profile.get('income', 0)
-        age = user_profile.get('age', 30)
-        monthly_savings = user_profile.get('monthly_savings', 0)
-        
         # Analyze user message for common financial topics
-        message_lower = user_message.lower()
+        topic, suggestion_topic = _find_topics(user_message)
+        response = _fallback_chat_reply(
+            topic or 'default', profile.income, profile.monthly_savings, profile.emergency_fund
+        )
         
-        if any(word in message_lower for word in ['tax', 'taxes', 'itr', 'deduction']):
-            response = f"""**Main Advice:**
-Based on your ₹{income:,} annual income, you should focus on maximizing tax deductions through Section 80C investments and other eligible expenses to reduce your tax liability.
-
-**Specific Numbers:**
-Section 80C limit: ₹1.5 lakh (potential tax saving: ₹{income//100000*150000//100:,})
-Health insurance (80D): ₹25,000 (potential tax saving: ₹{income//100000*25000//100:,})
-Standard deduction: ₹50,000 (automatic)
-
-**Action Steps:**
-1. Invest in ELSS mutual funds or PPF to utilize 80C limit
-2. Purchase health insurance for family members
-3. Claim HRA if you're paying rent
-4. Consider NPS for additional ₹50,000 deduction
-
-**Timeline:**
-Start tax planning immediately. Complete 80C investments by March 31st. File ITR by July 31st.
-
-**Risks & Considerations:**
-1. Don't invest just for tax savings - choose suitable products
-2. Keep proper documentation for all deductions
-3. Consider lock-in periods of tax-saving instruments"""
-
-        elif any(word in message_lower for word in ['invest', 'investment', 'mutual fund', 'stock']):
-            response = f"""**Main Advice:**
-Given your ₹{income:,} income and ₹{monthly_savings:,} monthly savings, you should adopt a systematic investment approach focusing on long-term wealth creation through diversified investments.
-
-**Specific Numbers:**
-Monthly investment capacity: ₹{monthly_savings:,}
-Recommended equity allocation: ₹{monthly_savings*70//100:,} (70% for growth)
-Debt allocation: ₹{monthly_savings*30//100:,} (30% for stability)
-Expected long-term returns: 12-15% annually
-
-**Action Steps:**
-1. Start SIP in diversified equity mutual funds
-2. Allocate 20% to large-cap, 30% to mid-cap, 20% to small-cap
-3. Consider index funds for lower costs
-4. Maintain emergency fund before investing
-
-**Timeline:**
-Begin SIP immediately. Review portfolio quarterly. Rebalance annually based on market conditions.
-
-**Risks & Considerations:**
-1. Equity investments are subject to market volatility
-2. Don't invest money needed within 3-5 years
-3. Diversify across sectors and market caps"""
-
-        elif any(word in message_lower for word in ['save', 'saving', 'emergency', 'fund']):
-            response = f"""**Main Advice:**
-Building a robust emergency fund should be your top priority. With ₹{income:,} annual income, you need 6-12 months of expenses saved for financial security.
-
-**Specific Numbers:**
-Target emergency fund: ₹{max(300000, income//12*6):,}
-Current gap: ₹{max(0, max(300000, income//12*6) - user_profile.get('emergency_fund', 0)):,}
-Monthly contribution needed: ₹{max(10000, monthly_savings//2):,}
-Recommended savings rate: 20-30% of income
-
-**Action Steps:**
-1. Open high-yield savings account (4-6% interest)
-2. Set up automatic monthly transfers
-3. Cut non-essential expenses by 15-20%
-4. Consider liquid mutual funds for better returns
-
-**Timeline:**
-Achieve 3-month target in 6 months, 6-month target in 12-18 months. Review monthly.
-
-**Risks & Considerations:**
-1. Don't invest emergency funds in volatile assets
-2. Ensure 24-48 hour liquidity
-3. Consider inflation impact on purchasing power"""
-
-        else:
-            response = f"""**Main Advice:**
-Based on your ₹{income:,} income and financial profile, I recommend creating a comprehensive financial plan that balances short-term needs with long-term goals.
-
-**Specific Numbers:**
-Monthly savings potential: ₹{monthly_savings:,}
-Emergency fund target: ₹{max(300000, income//12*6):,}
-Investment allocation: ₹{monthly_savings*80//100:,} monthly
-Insurance coverage needed: ₹{income*10:,} (10x annual income)
-
-**Action Steps:**
-1. Build emergency fund equivalent to 6 months of expenses
-2. Start systematic investment plan (SIP) in mutual funds
-3. Purchase adequate life and health insurance
-4. Create a budget and track expenses regularly
-
-**Timeline:**
-Emergency fund: 6-12 months. Investment portfolio: Start immediately, review quarterly. Insurance: Purchase within 1 month.
-
-**Risks & Considerations:**
-1. Don't delay insurance - health issues can arise anytime
-2. Maintain adequate emergency fund before aggressive investing
-3. Consider inflation and tax implications in long-term planning"""
-
         return {
             "response": response,
-            "suggestions": self._generate_suggestions(user_message),
+            "suggestions": _SUGGESTIONS[suggestion_topic or 'default'],
             "confidence": 0.8,
             "structured_data": {
                 "formatted_response": response,
@@ -830,9 +1292,9 @@ Emergency fund: 6-12 months. Investment portfolio: Start immediately, review qua
             }
         }
     
-    def _get_fallback_tax_recommendations(self, user_profile: Dict[str, Any]) -> Dict[str, Any]:
+    def _get_fallback_tax_recommendations(self, profile: Profile) -> Dict[str, Any]:
         """Fallback tax recommendations"""
-        income = user_profile.get('income', 0)
+        income = profile.income
         
         recommendations = []
         if income > 1000000:
@@ -862,104 +1324,54 @@ Emergency fund: 6-12 months. Investment portfolio: Start immediately, review qua
             "total_estimated_savings": sum(r["estimated_savings"] for r in recommendations)
         }
     
-    def _get_fallback_benefits(self, user_profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _get_fallback_benefits(self, profile: Profile) -> List[Dict[str, Any]]:
         """Fallback benefits recommendations"""
         return [
             {
                 "name": "General Government Benefits",
                 "description": "Based on your profile, you may be eligible for various Indian government programs. Visit india.gov.in for a comprehensive assessment.",
                 "eligibility_reason": "General eligibility based on income and location",
-                "link": "https://www.india.gov.in/topics/benefits",
+                "link": BENEFITS_PORTAL,
                 "amount": "Varies",
                 "category": "General",
                 "estimatedTime": "15-30 days"
             }
         ]
 
+    def _parse_chat_json(self, response: str) -> Dict[str, Any]:
+        """Parse a chat reply that follows _CHAT_RESPONSE_SCHEMA"""
+        data = orjson.loads(response)
+        if not isinstance(data, dict):
+            raise ValueError("Chat reply is not a JSON object")
+        
+        sections = {}
+        for key in _SECTION_KEYS.values():
+            text = data.get(key)
+            sections[key] = text.strip() if isinstance(text, str) else ''
+        if not any(sections.values()):
+            raise ValueError("Chat reply has no content")
+        for key, text in sections.items():
+            sections[key] = text or _SECTION_DEFAULTS[key]
+        
+        return {
+            "formatted_response": _format_sections(sections),
+            "sections": sections,
+            "original_response": response
+        }
+    
     def _parse_chat_response(self, response: str) -> Dict[str, Any]:
         """Parse structured chat response with bold labels"""
         try:
-            # Try to extract structured sections
             sections = {}
-            
-            # Look for main advice
-            if '**Main Advice:**' in response:
-                main_advice_start = response.find('**Main Advice:**') + len('**Main Advice:**')
-                main_advice_end = response.find('**', main_advice_start)
-                if main_advice_end == -1:
-                    main_advice_end = len(response)
-                main_advice = response[main_advice_start:main_advice_end].strip()
-                if main_advice and not main_advice.startswith('*'):
-                    sections['main_advice'] = main_advice
-                else:
-                    sections['main_advice'] = "Based on your financial profile, I recommend focusing on building a strong financial foundation through systematic savings and smart investments."
-            
-            # Look for specific numbers
-            if '**Specific Numbers:**' in response:
-                numbers_start = response.find('**Specific Numbers:**') + len('**Specific Numbers:**')
-                numbers_end = response.find('**', numbers_start)
-                if numbers_end == -1:
-                    numbers_end = len(response)
-                specific_numbers = response[numbers_start:numbers_end].strip()
-                if specific_numbers and not specific_numbers.startswith('*'):
-                    sections['specific_numbers'] = specific_numbers
-                else:
-                    sections['specific_numbers'] = "Consider setting aside 20-30% of your monthly income for savings and investments. Emergency fund target: 6 months of expenses."
-            
-            # Look for action steps
-            if '**Action Steps:**' in response:
-                steps_start = response.find('**Action Steps:**') + len('**Action Steps:**')
-                steps_end = response.find('**', steps_start)
-                if steps_end == -1:
-                    steps_end = len(response)
-                action_steps = response[steps_start:steps_end].strip()
-                if action_steps and not action_steps.startswith('*'):
-                    sections['action_steps'] = action_steps
-                else:
-                    sections['action_steps'] = "1. Review your current expenses and identify areas to cut back. 2. Set up automatic savings transfers. 3. Research investment options suitable for your risk profile. 4. Consult with a financial advisor for personalized guidance."
-            
-            # Look for timeline
-            if '**Timeline:**' in response:
-                timeline_start = response.find('**Timeline:**') + len('**Timeline:**')
-                timeline_end = response.find('**', timeline_start)
-                if timeline_end == -1:
-                    timeline_end = len(response)
-                timeline = response[timeline_start:timeline_end].strip()
-                if timeline and not timeline.startswith('*'):
-                    sections['timeline'] = timeline
-                else:
-                    sections['timeline'] = "Start implementing these steps immediately. Review progress monthly and adjust strategies quarterly. Set quarterly milestones to track your financial goals."
-            
-            # Look for risks
-            if '**Risks & Considerations:**' in response:
-                risks_start = response.find('**Risks & Considerations:**') + len('**Risks & Considerations:**')
-                risks_end = response.find('**', risks_start)
-                if risks_end == -1:
-                    risks_end = len(response)
-                risks = response[risks_start:risks_end].strip()
-                if risks and not risks.startswith('*'):
-                    sections['risks'] = risks
-                else:
-                    sections['risks'] = "1. Market volatility can affect investment returns. 2. Inflation may reduce purchasing power over time. 3. Ensure adequate insurance coverage for unexpected events."
+            for key, start, end in _iter_sections(response):
+                sections[key] = response[start:end].strip() or _SECTION_DEFAULTS[key]
             
             # Create formatted response with emojis and better structure
             if sections:
-                formatted_parts = []
-                if 'main_advice' in sections:
-                    formatted_parts.append(f"**Main Advice:**\n{sections['main_advice']}")
-                if 'specific_numbers' in sections:
-                    formatted_parts.append(f"**Specific Numbers:**\n{sections['specific_numbers']}")
-                if 'action_steps' in sections:
-                    formatted_parts.append(f"**Action Steps:**\n{sections['action_steps']}")
-                if 'timeline' in sections:
-                    formatted_parts.append(f"**Timeline:**\n{sections['timeline']}")
-                if 'risks' in sections:
-                    formatted_parts.append(f"**Risks & Considerations:**\n{sections['risks']}")
-                
-                formatted_response = "\n\n".join(formatted_parts)
+                formatted_response = _format_sections(sections)
             else:
                 # If no structured sections found, format the original response
-                formatted_response = response.replace('**', '**').replace('\n\n', '\n')
+                formatted_response = _BLANK_LINES_RE.sub('\n', response)
             
             return {
                 "formatted_response": formatted_response,
@@ -975,5 +1387,7 @@ Emergency fund: 6-12 months. Investment portfolio: Start immediately, review qua
                 "original_response": response
             }
 
-# Global instance
-ai_service = GeminiAIService() 
\ No newline at end of file
+@functools.cache
+def get_ai_service() -> GeminiAIService:
+    """Shared service instance, created on first use so one set of pooled clients serves the whole process"""
+    return GeminiAIService()
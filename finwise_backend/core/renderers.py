@@ -0,0 +1,17 @@
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# DRF's encoder covers the types orjson doesn't know (Decimal, lazy strings, querysets...)
+_drf_default = JSONEncoder().default
+
+class ORJSONRenderer(BaseRenderer):
+    """JSON renderer backed by orjson, which encodes straight to UTF-8 bytes"""
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=_drf_default, option=orjson.OPT_NON_STR_KEYS)
@@ -2,7 +2,7 @@ from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
     CustomTokenObtainPairView, ProfileView, DashboardView, TaxSavingsView, 
-    ChatbotView, BenefitsView, ReportsView, UserRegistrationView, 
+    ChatbotView, ChatbotStreamView, BenefitsView, ReportsView, UserRegistrationView, 
     UserDetailView, ChangePasswordView, WisdomLibraryView, BookListView,
     BookDetailView, UserReadingHistoryView, UserPreferencesView, health_check
 )
@@ -24,6 +24,7 @@ urlpatterns = [
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
     path('tax-savings/', TaxSavingsView.as_view(), name='tax_savings'),
     path('chatbot/', ChatbotView.as_view(), name='chatbot'),
+    path('chatbot/stream/', ChatbotStreamView.as_view(), name='chatbot_stream'),
     path('benefits/', BenefitsView.as_view(), name='benefits'),
     path('reports/', ReportsView.as_view(), name='reports'),
     
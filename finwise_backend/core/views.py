@@ -1,9 +1,10 @@
 import os
 import json
 import random
+import orjson
 from datetime import datetime, timedelta
 from django.db.models import Q, Avg, Count
-from django.http import JsonResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework import generics, permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -19,16 +20,16 @@ from .serializers import (
     UserReadingHistorySerializer, BookRecommendationSerializer,
     UserRegistrationSerializer
 )
-from .ai_service import ai_service
+from .ai_service import get_ai_service
 
 def health_check(request):
     """Health check endpoint for monitoring"""
-    return JsonResponse({
+    return HttpResponse(orjson.dumps({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
         'service': 'Finwise Backend API',
         'version': '1.0.0'
-    })
+    }), content_type='application/json')
 
 def generate_tax_tips(profile):
     tips = []
@@ -78,34 +79,41 @@ def calculate_savings_progress(profile):
         'progress_percentage': min(progress, 100)
     }
 
+def get_ai_profile_dict(profile):
+    """Profile fields passed to the AI service for tax and benefits recommendations.
+
+    Every view uses this same dict so their answers share one cache entry.
+    """
+    return {
+        'income': profile.income,
+        'age': profile.age,
+        'dependents': profile.dependents,
+        'tax_deductions': profile.tax_deductions,
+        'investment_amount': profile.investment_amount,
+        'investment_types': profile.investment_types,
+        'monthly_savings': profile.monthly_savings,
+        'total_savings': profile.total_savings,
+        'savings_goal': profile.savings_goal,
+        'emergency_fund': profile.emergency_fund,
+        'retirement_savings': profile.retirement_savings,
+        'occupation': profile.occupation,
+        'city': profile.city,
+        'state': profile.state,
+        'marital_status': profile.marital_status,
+        'education': profile.education,
+        'business_type': profile.business_type,
+        'property_owned': profile.property_owned,
+        'vehicle_owned': profile.vehicle_owned
+    }
+
 def get_gemini_tax_recommendations(profile):
     """Get AI-powered tax recommendations using Gemini"""
     try:
         # Convert profile to dictionary for AI service
-        profile_dict = {
-            'income': profile.income,
-            'age': profile.age,
-            'dependents': profile.dependents,
-            'tax_deductions': profile.tax_deductions,
-            'investment_amount': profile.investment_amount,
-            'investment_types': profile.investment_types,
-            'monthly_savings': profile.monthly_savings,
-            'total_savings': profile.total_savings,
-            'savings_goal': profile.savings_goal,
-            'emergency_fund': profile.emergency_fund,
-            'retirement_savings': profile.retirement_savings,
-            'occupation': profile.occupation,
-            'city': profile.city,
-            'state': profile.state,
-            'marital_status': profile.marital_status,
-            'education': profile.education,
-            'business_type': profile.business_type,
-            'property_owned': profile.property_owned,
-            'vehicle_owned': profile.vehicle_owned
-        }
+        profile_dict = get_ai_profile_dict(profile)
         
         # Use Gemini AI service
-        response = ai_service.generate_tax_recommendations(profile_dict)
+        response = get_ai_service().generate_tax_recommendations(profile_dict)
         print("Gemini Tax: Successfully generated response")
         return response
         
@@ -506,6 +514,8 @@ class ChatbotView(APIView):
             # Get user profile for context
             profile, _ = UserProfile.objects.get_or_create(user=request.user)
             
+            self.prefetch_recommendations(profile)
+            
             # Get AI response using Gemini
             ai_response = self.get_gemini_chat_response(user_message, profile)
             
@@ -517,31 +527,45 @@ class ChatbotView(APIView):
             
         except Exception as e:
             print(f"Chatbot error: {e}")
-            return Response({
-                'response': "I'm having trouble processing your request right now. Please try again in a moment.",
-                'suggestions': ["Tax savings tips", "Investment advice", "Government benefits"],
-                'confidence': 0.5
-            }, status=500)
+            return self.get_error_response()
+
+    def get_error_response(self):
+        """JSON reply for a request that failed before any answer was generated"""
+        return Response({
+            'response': "I'm having trouble processing your request right now. Please try again in a moment.",
+            'suggestions': ["Tax savings tips", "Investment advice", "Government benefits"],
+            'confidence': 0.5
+        }, status=500)
+
+    def prefetch_recommendations(self, profile):
+        """Warm tax and benefits recommendations while the chat reply is generated"""
+        try:
+            get_ai_service().prefetch_recommendations(get_ai_profile_dict(profile))
+        except Exception as e:
+            print(f"Recommendations prefetch error: {e}")
+
+    def get_profile_dict(self, profile):
+        """Convert profile to dictionary for AI service"""
+        return {
+            'income': profile.income,
+            'age': profile.age,
+            'investment_amount': profile.investment_amount,
+            'dependents': profile.dependents,
+            'occupation': profile.occupation,
+            'city': profile.city,
+            'state': profile.state,
+            'emergency_fund': profile.emergency_fund,
+            'retirement_savings': profile.retirement_savings,
+            'tax_deductions': profile.tax_deductions
+        }
 
     def get_gemini_chat_response(self, user_message, profile):
         """Get AI response using Gemini"""
         try:
-            # Convert profile to dictionary for AI service
-            profile_dict = {
-                'income': profile.income,
-                'age': profile.age,
-                'investment_amount': profile.investment_amount,
-                'dependents': profile.dependents,
-                'occupation': profile.occupation,
-                'city': profile.city,
-                'state': profile.state,
-                'emergency_fund': profile.emergency_fund,
-                'retirement_savings': profile.retirement_savings,
-                'tax_deductions': profile.tax_deductions
-            }
+            profile_dict = self.get_profile_dict(profile)
             
             # Use Gemini AI service
-            response = ai_service.generate_chat_response(user_message, profile_dict)
+            response = get_ai_service().generate_chat_response(user_message, profile_dict)
             print("Gemini Chat: Successfully generated response")
             return response
             
@@ -614,6 +638,52 @@ class ChatbotView(APIView):
             "confidence": 0.6
         }
     
+class ChatbotStreamView(ChatbotView):
+    """Chatbot endpoint that streams Gemini output as Server-Sent Events"""
+
+    def post(self, request):
+        """Stream chatbot messages as `data: {json}` frames"""
+        try:
+            user_message = request.data.get('message', '')
+            if not user_message:
+                return Response({'error': 'Message is required'}, status=400)
+
+            profile, _ = UserProfile.objects.get_or_create(user=request.user)
+            self.prefetch_recommendations(profile)
+
+        except Exception as e:
+            print(f"Chatbot stream error: {e}")
+            return self.get_error_response()
+
+        # Resolve the service before the 200 headers go out, so a failure to
+        # build it still ends the stream with a fallback reply
+        try:
+            events = get_ai_service().generate_chat_response_stream(user_message, self.get_profile_dict(profile))
+        except Exception as e:
+            print(f"Gemini chat stream error: {e}")
+            events = iter([{'done': True, **self.get_fallback_response(user_message, profile)}])
+
+        response = StreamingHttpResponse(
+            self.stream_events(events),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream before it reaches the client
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def stream_events(self, events):
+        """Wrap AI service stream events in SSE frames"""
+        for event in events:
+            if event.get('done'):
+                event = {
+                    'done': True,
+                    'response': event['response'],
+                    'suggestions': event.get('suggestions', []),
+                    'confidence': event.get('confidence', 0.8)
+                }
+            yield b"data: " + orjson.dumps(event) + b"\n\n"
+
 
 
 
@@ -631,24 +701,10 @@ class BenefitsView(APIView):
         """Get AI-powered benefits recommendations using Gemini"""
         try:
             # Convert profile to dictionary for AI service
-            profile_dict = {
-                'income': profile.income,
-                'age': profile.age,
-                'dependents': profile.dependents,
-                'occupation': profile.occupation,
-                'investment_amount': profile.investment_amount,
-                'emergency_fund': profile.emergency_fund,
-                'retirement_savings': profile.retirement_savings,
-                'tax_deductions': profile.tax_deductions,
-                'city': profile.city,
-                'state': profile.state,
-                'marital_status': profile.marital_status,
-                'education': profile.education,
-                'business_type': profile.business_type
-            }
+            profile_dict = get_ai_profile_dict(profile)
             
             # Use Gemini AI service
-            response = ai_service.generate_benefits_recommendations(profile_dict)
+            response = get_ai_service().generate_benefits_recommendations(profile_dict)
             print("Gemini Benefits: Successfully generated response")
             return response
             
@@ -1095,24 +1151,10 @@ class ReportsView(APIView):
         """Get AI-powered benefits recommendations using Gemini"""
         try:
             # Convert profile to dictionary for AI service
-            profile_dict = {
-                'income': profile.income,
-                'age': profile.age,
-                'dependents': profile.dependents,
-                'occupation': profile.occupation,
-                'investment_amount': profile.investment_amount,
-                'emergency_fund': profile.emergency_fund,
-                'retirement_savings': profile.retirement_savings,
-                'tax_deductions': profile.tax_deductions,
-                'city': profile.city,
-                'state': profile.state,
-                'marital_status': profile.marital_status,
-                'education': profile.education,
-                'business_type': profile.business_type
-            }
+            profile_dict = get_ai_profile_dict(profile)
             
             # Use Gemini AI service
-            response = ai_service.generate_benefits_recommendations(profile_dict)
+            response = get_ai_service().generate_benefits_recommendations(profile_dict)
             print("Gemini Reports Benefits: Successfully generated response")
             return response
             
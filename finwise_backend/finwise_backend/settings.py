@@ -68,6 +68,24 @@ DATABASES = {
     }
 }
 
+# Cache shared by every gunicorn worker when REDIS_URL is set (e.g. Memorystore);
+# otherwise each process keeps its own in-memory cache
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'TIMEOUT': 1800,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'TIMEOUT': 1800,
+        }
+    }
+
 AUTH_PASSWORD_VALIDATORS = []
 
 LANGUAGE_CODE = 'en-us'
@@ -81,6 +99,28 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+if not DEBUG:
+    # Serve collected static files from gunicorn with WhiteNoise. Hashed, pre-
+    # compressed names are built once at collectstatic, so each request is just
+    # a lookup. WhiteNoise caches hashed files forever on its own; anything served
+    # under its unhashed name keeps the short default max-age so it can't go
+    # stale across deploys.
+    # HTTPS is enforced by the proxy in front, so SECURE_SSL_REDIRECT stays off.
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+        'whitenoise.middleware.WhiteNoiseMiddleware'
+    )
+    STORAGES = {
+        'default': {
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        },
+        'staticfiles': {
+            'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+        },
+    }
+    WHITENOISE_USE_FINDERS = False
+    WHITENOISE_MANIFEST_STRICT = False
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # CORS settings
@@ -92,4 +132,8 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
@@ -4,3 +4,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finwise_backend.settings')
 
 application = get_wsgi_application()
+
+# Import the AI module here so its regexes, templates and schemas are built once
+# in the gunicorn master (run with --preload) and shared copy-on-write by the
+# forked workers. The service itself is still created lazily in each worker,
+# since pooled connections must not be shared across a fork.
+import core.ai_service  # noqa: E402,F401
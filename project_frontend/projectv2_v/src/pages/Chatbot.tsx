@@ -119,33 +119,41 @@ const Chatbot = () => {
     setInputText('');
     setIsTyping(true);
 
+    const botMessageId = (Date.now() + 1).toString();
+
     try {
-      // Call the real API
-      const response = await chatbotAPI.sendMessage(inputText);
+      // Call the real API, showing the reply as it streams in
+      const response = await chatbotAPI.streamMessage(inputText, (chunk) => {
+        setIsTyping(false);
+        setMessages(prev => prev.some(m => m.id === botMessageId)
+          ? prev.map(m => m.id === botMessageId ? { ...m, text: m.text + chunk } : m)
+          : [...prev, { id: botMessageId, text: chunk, sender: 'bot', timestamp: new Date() }]);
+      });
       
       const botMessage: Message = {
-        id: (Date.now() + 1).toString(),
+        id: botMessageId,
         text: response.response,
         sender: 'bot',
         timestamp: new Date(),
         suggestions: response.suggestions
       };
 
-      setMessages(prev => [...prev, botMessage]);
+      setMessages(prev => [...prev.filter(m => m.id !== botMessageId), botMessage]);
     } catch (error) {
       console.error('Chatbot API error:', error);
       
       // Fallback to predefined responses
       const botResponse = getBotResponse(inputText);
       const botMessage: Message = {
-        id: (Date.now() + 1).toString(),
+        id: botMessageId,
         text: botResponse.text,
         sender: 'bot',
         timestamp: new Date(),
         suggestions: botResponse.suggestions
       };
 
-      setMessages(prev => [...prev, botMessage]);
+      // Replace any partly streamed reply
+      setMessages(prev => [...prev.filter(m => m.id !== botMessageId), botMessage]);
     } finally {
       setIsTyping(false);
     }
@@ -175,6 +175,46 @@ export const chatbotAPI = {
     method: 'POST',
     body: JSON.stringify({ message }),
   }),
+
+  // Stream a reply as Server-Sent Events: onChunk gets each piece of text as it
+  // arrives, and the final event (response, suggestions, confidence) is returned
+  streamMessage: async (message: string, onChunk: (text: string) => void) => {
+    const token = localStorage.getItem('access_token');
+    const response = await fetch(`${API_BASE_URL}/chatbot/stream/`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(token && { 'Authorization': `Bearer ${token}` }),
+      },
+      body: JSON.stringify({ message }),
+    });
+
+    if (!response.ok || !response.body) {
+      const errorData = await response.json().catch(() => ({}));
+      console.error('API error:', errorData);
+      throw new Error(errorData.error || errorData.detail || `HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Frames are "data: {json}" separated by a blank line; keep any partial frame
+      const frames = buffer.split('\n\n');
+      buffer = frames.pop() || '';
+      for (const frame of frames) {
+        if (!frame.startsWith('data: ')) continue;
+        const event = JSON.parse(frame.slice('data: '.length));
+        if (event.done) return event;
+        if (event.chunk) onChunk(event.chunk);
+      }
+    }
+    throw new Error('Chat stream ended without a reply');
+  },
 };
 
 // Financial Wisdom Library API functions